@@ -0,0 +1,35 @@
+"""unwrap workout metadata stored as a JSON string
+
+Data-only migration. The old parameterised INSERT double-encoded
+``workouts.metadata``, so rows imported before the COPY path hold a JSON string
+instead of an object and ``/api/workouts`` returned that string. Rewrites them
+as objects.
+
+The logic lives in app.migrations_support.workout_metadata and is unit-tested
+there. It only touches string-typed values that decode to an object, so it is
+idempotent. One-way: downgrade does not re-encode.
+
+Revision ID: a3c5e7f9b1d2
+Revises: f9b1d3e5a7c2
+Create Date: 2026-10-16 12:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.migrations_support.workout_metadata import unwrap_string_metadata
+
+revision: str = "a3c5e7f9b1d2"
+down_revision: Union[str, None] = "f9b1d3e5a7c2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    unwrap_string_metadata(op.get_bind())
+
+
+def downgrade() -> None:
+    # The string form was a bug, not a format anything relied on. No-op.
+    pass
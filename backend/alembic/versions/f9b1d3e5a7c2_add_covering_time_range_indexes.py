@@ -0,0 +1,74 @@
+"""add covering (user, type, time) indexes for the time-range read path
+
+``query_metric``, the dashboard summary and ``get_available_metrics`` all filter
+``health_records`` on ``(user_id, metric_type, time)`` and aggregate ``value``.
+The existing ``ix_health_records_user_metric_time`` matched the predicate but
+not the aggregate, so every matching row still cost a heap fetch. It is replaced
+(not joined) by the same key with ``INCLUDE (value)`` so those aggregates run as
+index-only scans without adding a fourth index to the hottest insert table.
+
+``category_records`` had no index leading on ``user_id`` at all (its PK leads on
+``time``), so ``query_category`` fell back to a wider scan; it gets the matching
+``(user_id, category_type, time)`` key, including ``value_label`` (what the query
+groups on). ``workouts`` needs nothing: ``uq_workout_dedup`` already leads on
+``(user_id, time)``.
+
+Built ``CONCURRENTLY`` (outside the migration transaction) so a deploy doesn't
+hold a write lock on the large raw tables while the index builds. A btree is
+scanned backwards as cheaply as forwards, so ``time`` stays ascending.
+
+Revision ID: f9b1d3e5a7c2
+Revises: e1f2a3b4c9d0
+Create Date: 2026-10-16 10:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = 'f9b1d3e5a7c2'
+down_revision: Union[str, None] = 'e1f2a3b4c9d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_health_records_user_metric_time_cov',
+            'health_records',
+            ['user_id', 'metric_type', 'time'],
+            postgresql_include=['value'],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_health_records_user_metric_time',
+            table_name='health_records',
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_category_records_user_type_time',
+            'category_records',
+            ['user_id', 'category_type', 'time'],
+            postgresql_include=['value_label'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_category_records_user_type_time',
+            table_name='category_records',
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_health_records_user_metric_time',
+            'health_records',
+            ['user_id', 'metric_type', 'time'],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_health_records_user_metric_time_cov',
+            table_name='health_records',
+            postgresql_concurrently=True,
+        )
@@ -88,13 +88,18 @@ def _run_parser_sync(file_path: str, user_id: int, batch_id: str, database_url:
     """Run the async XML parser in a fresh event loop with its own engine."""
     import logging as _logging
     from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
 
     # Ensure app loggers are visible (background thread may not inherit config)
     _logging.basicConfig(level=_logging.INFO, format="%(levelname)s:%(name)s:%(message)s")
 
+    # Each consumer flushes its batch's tables concurrently (one connection per
+    # table, HEALTH_COPY_PARALLELISM for health_records), so size the pool for
+    # NUM_CONSUMERS x that plus the reporter and the producer's DataSource lookups.
     engine = create_async_engine(
         database_url, echo=False,
-        pool_size=8, max_overflow=4,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=8, max_overflow=10,
     )
     session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
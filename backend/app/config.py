@@ -1,3 +1,4 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings
 
 
@@ -84,6 +85,11 @@ class Settings(BaseSettings):
     # on full SQL echo. Set <= 0 to log every statement (useful when debugging).
     SLOW_QUERY_MS: int = 200
 
+    # Apple Health XML import: rows of one table the parser collects before
+    # handing the table to the insert consumers. Up to 8 such batches queue in
+    # memory; past ~20K the COPY round trips are amortised and only memory grows.
+    IMPORT_BATCH_ROWS: int = Field(20_000, gt=0)
+
     model_config = {"env_file": ".env", "extra": "ignore"}
 
 
@@ -0,0 +1,31 @@
+"""Unwrap ``workouts.metadata`` rows stored as a JSON *string*.
+
+Used by the Alembic data migration (``a3c5e7f9b1d2``) and exercised directly by
+tests. Pure SQLAlchemy Core against a sync ``Connection`` so it runs inside an
+Alembic migration unchanged.
+
+Workouts used to be written through a parameterised INSERT that ``json.dumps``'d
+the metadata dict before the JSONB bind encoded it again, so the column held a
+JSON string (``"{\\"HKIndoorWorkout\\": \\"0\\"}"``) rather than an object. The
+COPY path writes the object, so older rows are rewritten to match: a string
+whose text is itself a JSON object is replaced by that object. Anything else
+(objects, NULLs, a string that is not an encoded object) is left alone, so
+re-running it is a no-op.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def unwrap_string_metadata(conn: Connection) -> int:
+    """Rewrite string-encoded workout metadata as JSON objects; returns the count."""
+    result = conn.execute(
+        text(
+            "UPDATE workouts SET metadata = (metadata #>> '{}')::jsonb "
+            "WHERE jsonb_typeof(metadata) = 'string' "
+            "AND left(ltrim(metadata #>> '{}'), 1) = '{'"
+        )
+    )
+    return result.rowcount
@@ -12,6 +12,13 @@ class CategoryRecord(Base):
     __tablename__ = "category_records"
     __table_args__ = (
         Index("ix_category_records_batch_id", "batch_id"),
+        Index(
+            "ix_category_records_user_type_time",
+            "user_id",
+            "category_type",
+            "time",
+            postgresql_include=["value_label"],
+        ),
     )
 
     time: Mapped[datetime] = mapped_column(
@@ -19,7 +19,14 @@ from app.database import Base
 class HealthRecord(Base):
     __tablename__ = "health_records"
     __table_args__ = (
-        Index("ix_health_records_user_metric_time", "user_id", "metric_type", "time"),
+        # Covering: the time-range aggregates over ``value`` are index-only scans.
+        Index(
+            "ix_health_records_user_metric_time_cov",
+            "user_id",
+            "metric_type",
+            "time",
+            postgresql_include=["value"],
+        ),
         Index("ix_health_records_batch_id", "batch_id"),
         UniqueConstraint(
             "user_id",
@@ -1,15 +1,31 @@
 """Time-series aggregation queries and dashboard helpers.
 
 All functions accept an ``AsyncSession`` and return results directly -- they
-do **not** manage transactions themselves.
+do **not** manage transactions themselves. The two time-series queries, whose
+result sets can run to hundreds of thousands of rows at minute resolution,
+validate their arguments when called and return an async iterator that streams
+the result in partitions instead of materialising it. Iterate it to the end or
+wrap it in :func:`contextlib.aclosing` so the server-side cursor is released.
 """
 
 from __future__ import annotations
 
 import datetime as dt
+from collections.abc import AsyncIterator, Callable
 from typing import Any, Literal
 
-from sqlalchemy import Date, Float, case, cast, distinct, func, select, text
+from sqlalchemy import (
+    Date,
+    Float,
+    Row,
+    Select,
+    case,
+    cast,
+    distinct,
+    func,
+    select,
+    text,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.activity_summary import ActivitySummary
@@ -29,13 +45,16 @@ _VALID_RESOLUTIONS: set[str] = {
     "year",
 }
 
+# Rows per partition yielded by the streaming time-series queries.
+_STREAM_PARTITION_SIZE = 1_000
+
 
 # ------------------------------------------------------------------
 # Metric time-series
 # ------------------------------------------------------------------
 
 
-async def query_metric(
+def query_metric(
     session: AsyncSession,
     user_id: int,
     metric_type: str,
@@ -43,8 +62,8 @@ async def query_metric(
     end: dt.datetime | None = None,
     resolution: Resolution = "day",
     aggregate: Literal["avg", "sum", "min", "max", "count"] = "avg",
-) -> list[dict[str, Any]]:
-    """Return an aggregated time-series for a single health metric.
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Stream an aggregated time-series for a single health metric.
 
     Parameters
     ----------
@@ -63,8 +82,14 @@ async def query_metric(
 
     Returns
     -------
-    list[dict]
-        Each dict has ``{"bucket": datetime, "value": float, "count": int}``.
+    AsyncIterator[list[dict]]
+        Partitions of up to ``_STREAM_PARTITION_SIZE`` buckets, in bucket order;
+        each dict has ``{"bucket": datetime, "value": float, "count": int}``.
+
+    Raises
+    ------
+    ValueError
+        On an unknown *resolution* or *aggregate*, at call time.
     """
     if resolution not in _VALID_RESOLUTIONS:
         raise ValueError(
@@ -94,11 +119,15 @@ async def query_metric(
     if end is not None:
         stmt = stmt.where(HealthRecord.time <= end)
 
-    result = await session.execute(stmt)
-    return [
-        {"bucket": row.bucket, "value": float(row.value) if row.value else 0.0, "count": row.count}
-        for row in result.all()
-    ]
+    return _stream_partitions(
+        session,
+        stmt,
+        lambda row: {
+            "bucket": row.bucket,
+            "value": float(row.value) if row.value else 0.0,
+            "count": row.count,
+        },
+    )
 
 
 # ------------------------------------------------------------------
@@ -210,52 +239,36 @@ async def get_dashboard_summary(
 
     summary: dict[str, Any] = {"date": target_date}
 
-    # Steps
-    steps_stmt = (
-        select(func.sum(HealthRecord.value))
-        .where(
-            HealthRecord.user_id == user_id,
-            HealthRecord.metric_type == "StepCount",
-            HealthRecord.time >= day_start,
-            HealthRecord.time <= day_end,
-        )
-    )
-    result = await session.execute(steps_stmt)
-    summary["steps"] = result.scalar() or 0.0
-
-    # Active energy (from HealthRecord)
-    energy_stmt = (
-        select(func.sum(HealthRecord.value))
-        .where(
-            HealthRecord.user_id == user_id,
-            HealthRecord.metric_type == "ActiveEnergyBurned",
-            HealthRecord.time >= day_start,
-            HealthRecord.time <= day_end,
-        )
-    )
-    result = await session.execute(energy_stmt)
-    summary["active_energy_kj"] = result.scalar() or 0.0
-
-    # Heart rate stats
-    hr_stmt = (
+    # Steps / active energy / heart rate all read the same (user, day) slice of
+    # health_records, so one pass with FILTERed aggregates replaces three scans.
+    is_steps = HealthRecord.metric_type == "StepCount"
+    is_energy = HealthRecord.metric_type == "ActiveEnergyBurned"
+    is_hr = HealthRecord.metric_type == "HeartRate"
+    health_stmt = (
         select(
-            func.avg(HealthRecord.value).label("avg"),
-            func.min(HealthRecord.value).label("min"),
-            func.max(HealthRecord.value).label("max"),
+            func.sum(HealthRecord.value).filter(is_steps).label("steps"),
+            func.sum(HealthRecord.value).filter(is_energy).label("energy"),
+            func.avg(HealthRecord.value).filter(is_hr).label("hr_avg"),
+            func.min(HealthRecord.value).filter(is_hr).label("hr_min"),
+            func.max(HealthRecord.value).filter(is_hr).label("hr_max"),
         )
         .where(
             HealthRecord.user_id == user_id,
-            HealthRecord.metric_type == "HeartRate",
+            HealthRecord.metric_type.in_(
+                ["StepCount", "ActiveEnergyBurned", "HeartRate"]
+            ),
             HealthRecord.time >= day_start,
             HealthRecord.time <= day_end,
         )
     )
-    result = await session.execute(hr_stmt)
-    row = result.one_or_none()
-    if row and row.avg is not None:
-        summary["heart_rate_avg"] = round(float(row.avg), 1)
-        summary["heart_rate_min"] = float(row.min) if row.min else None
-        summary["heart_rate_max"] = float(row.max) if row.max else None
+    result = await session.execute(health_stmt)
+    row = result.one()
+    summary["steps"] = row.steps or 0.0
+    summary["active_energy_kj"] = row.energy or 0.0
+    if row.hr_avg is not None:
+        summary["heart_rate_avg"] = round(float(row.hr_avg), 1)
+        summary["heart_rate_min"] = float(row.hr_min) if row.hr_min else None
+        summary["heart_rate_max"] = float(row.hr_max) if row.hr_max else None
     else:
         summary["heart_rate_avg"] = None
         summary["heart_rate_min"] = None
@@ -304,20 +317,26 @@ async def get_dashboard_summary(
 # ------------------------------------------------------------------
 
 
-async def query_category(
+def query_category(
     session: AsyncSession,
     user_id: int,
     category_type: str,
     start: dt.datetime | None = None,
     end: dt.datetime | None = None,
     resolution: Resolution = "day",
-) -> list[dict[str, Any]]:
-    """Return counts of category record values bucketed by time.
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Stream counts of category record values bucketed by time.
 
     Returns
     -------
-    list[dict]
+    AsyncIterator[list[dict]]
+        Partitions of up to ``_STREAM_PARTITION_SIZE`` rows, in bucket order:
         ``[{"bucket": datetime, "value_label": str, "count": int}, ...]``
+
+    Raises
+    ------
+    ValueError
+        On an unknown *resolution*, at call time.
     """
     if resolution not in _VALID_RESOLUTIONS:
         raise ValueError(f"Invalid resolution {resolution!r}")
@@ -342,15 +361,15 @@ async def query_category(
     if end is not None:
         stmt = stmt.where(CategoryRecord.time <= end)
 
-    result = await session.execute(stmt)
-    return [
-        {
+    return _stream_partitions(
+        session,
+        stmt,
+        lambda row: {
             "bucket": row.bucket,
             "value_label": row.value_label,
             "count": row.count,
-        }
-        for row in result.all()
-    ]
+        },
+    )
 
 
 # ------------------------------------------------------------------
@@ -408,18 +427,38 @@ async def get_workout_summary(
 # ------------------------------------------------------------------
 
 
+_AGG_FUNCS = {
+    "avg": func.avg,
+    "sum": func.sum,
+    "min": func.min,
+    "max": func.max,
+    "count": func.count,
+}
+
+
+async def _stream_partitions(
+    session: AsyncSession,
+    stmt: Select,
+    to_dict: Callable[[Row], dict[str, Any]],
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Stream *stmt* in partitions of ``_STREAM_PARTITION_SIZE`` row dicts.
+
+    The streaming result is closed however iteration ends (exhausted, an
+    error, or the generator being closed early).
+    """
+    result = await session.stream(stmt)
+    try:
+        async for partition in result.partitions(_STREAM_PARTITION_SIZE):
+            yield [to_dict(row) for row in partition]
+    finally:
+        await result.close()
+
+
 def _agg_func(name: str):
     """Return the SQLAlchemy aggregate function for the given name."""
-    mapping = {
-        "avg": func.avg,
-        "sum": func.sum,
-        "min": func.min,
-        "max": func.max,
-        "count": func.count,
-    }
-    fn = mapping.get(name.lower())
+    fn = _AGG_FUNCS.get(name)
     if fn is None:
         raise ValueError(
-            f"Unknown aggregate {name!r}; choose from {sorted(mapping)}"
+            f"Unknown aggregate {name!r}; choose from {sorted(_AGG_FUNCS)}"
         )
     return fn
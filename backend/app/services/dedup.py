@@ -1,26 +1,25 @@
 """Bulk-insert helpers with ON CONFLICT DO NOTHING for idempotent imports.
 
-Uses PostgreSQL COPY for high-volume tables (health_records, category_records,
-activity_summaries, workout_route_points) via a temp-table staging pattern.
-Workouts use parameterised INSERT due to the JSONB metadata column.
+Uses PostgreSQL COPY via a temp-table staging pattern for every table the
+Apple Health import writes (JSONB is COPYed as its JSON text).
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+from collections.abc import Mapping, Sequence
 from typing import Any
 
-from sqlalchemy import inspect
-from sqlalchemy.dialects.postgresql import insert as pg_insert
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.models.workout import Workout
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 logger = logging.getLogger(__name__)
 
-
-_MAX_PARAMS = 32_000  # asyncpg hard limit is 32767; leave margin
+# deadlock_detected / serialization_failure: the statement lost a lock race
+# with a concurrent writer and can simply be rerun.
+_RETRYABLE_SQLSTATES = frozenset({"40P01", "40001"})
+_COPY_ATTEMPTS = 3
 
 
 # ------------------------------------------------------------------
@@ -69,8 +68,10 @@ async def _copy_upsert(
     # Create an unlogged temp table matching the target schema (structure only).
     # Avoid ON COMMIT DROP because the raw asyncpg connection may auto-commit
     # each statement, which would drop the table before COPY runs.
-    await asyncpg_conn.execute(f"DROP TABLE IF EXISTS {tmp}")
+    # Argument-less execute() uses the simple query protocol, so statements
+    # sent together cost one round trip.
     await asyncpg_conn.execute(
+        f"DROP TABLE IF EXISTS {tmp}; "
         f"CREATE TEMP TABLE {tmp} (LIKE {table_name} INCLUDING DEFAULTS)"
     )
 
@@ -86,53 +87,76 @@ async def _copy_upsert(
         conflict_clause = "ON CONFLICT DO NOTHING"
 
     await asyncpg_conn.execute(
-        f"INSERT INTO {table_name} ({col_list}) SELECT {col_list} FROM {tmp} {conflict_clause}"
+        f"INSERT INTO {table_name} ({col_list}) SELECT {col_list} FROM {tmp} {conflict_clause}; "
+        f"DROP TABLE IF EXISTS {tmp}"
     )
 
-    await asyncpg_conn.execute(f"DROP TABLE IF EXISTS {tmp}")
-
     return len(records)
 
 
-# ------------------------------------------------------------------
-# Parameterised INSERT fallback (for tables with complex types like JSONB)
-# ------------------------------------------------------------------
-
-
-async def _bulk_upsert(
-    session: AsyncSession,
-    model: type,
-    rows: list[dict[str, Any]],
+async def _copy_upsert_parallel(
+    session_factory: async_sessionmaker,
+    table_name: str,
+    columns: list[str],
+    records: list[tuple],
     *,
-    conflict_target: list[str] | None = None,
+    conflict_target: str | None = None,
+    parallelism: int = 2,
 ) -> int:
-    """Insert *rows* into *model*'s table, silently skipping conflicts.
-
-    Automatically chunks into multiple INSERT statements to stay within
-    asyncpg's 32 767 query-parameter limit.
-
-    Returns the number of rows in the batch (not necessarily inserted, since
-    conflicts are ignored).
+    """:func:`_copy_upsert` split into *parallelism* shards run concurrently.
+
+    Each shard COPYs on its own session (so its own connection and its own
+    session-local temp table) and commits independently, overlapping the
+    per-COPY round trips. Shards are contiguous slices, so the adjacent
+    duplicates of an ordered export stay within one shard rather than racing
+    each other on the destination's unique index.
+
+    Duplicates spread across shards (or across concurrent callers) can still
+    deadlock on that index; a shard that loses such a race is rerun on a fresh
+    session, up to ``_COPY_ATTEMPTS`` times, which ON CONFLICT makes safe.
+    Any other error, or a race lost on every attempt, propagates.
     """
-    if not rows:
+    if not records:
         return 0
 
-    table = inspect(model).local_table
-    num_cols = len(rows[0])
-    chunk_size = max(1, _MAX_PARAMS // num_cols)
-
-    for i in range(0, len(rows), chunk_size):
-        chunk = rows[i : i + chunk_size]
-        stmt = pg_insert(table).values(chunk)
-
-        if conflict_target:
-            stmt = stmt.on_conflict_do_nothing(index_elements=conflict_target)
-        else:
-            stmt = stmt.on_conflict_do_nothing()
+    shard_size = -(-len(records) // max(1, parallelism))
+
+    async def _copy_shard(shard: list[tuple]) -> None:
+        for attempt in range(1, _COPY_ATTEMPTS + 1):
+            try:
+                async with session_factory() as session:
+                    await _copy_upsert(
+                        session, table_name, columns, shard,
+                        conflict_target=conflict_target,
+                    )
+                    await session.commit()
+                return
+            except Exception as exc:
+                if attempt == _COPY_ATTEMPTS or not _is_retryable(exc):
+                    raise
+                logger.warning(
+                    "Retrying %d-row %s COPY shard after %s (attempt %d of %d)",
+                    len(shard), table_name, type(exc).__name__,
+                    attempt + 1, _COPY_ATTEMPTS,
+                )
+
+    await asyncio.gather(
+        *(
+            _copy_shard(records[i : i + shard_size])
+            for i in range(0, len(records), shard_size)
+        )
+    )
+    return len(records)
 
-        await session.execute(stmt)
 
-    return len(rows)
+def _is_retryable(exc: BaseException) -> bool:
+    """True if *exc* (raw asyncpg or SQLAlchemy-wrapped) is a lost lock race."""
+    seen: BaseException | None = exc
+    while seen is not None:
+        if getattr(seen, "sqlstate", None) in _RETRYABLE_SQLSTATES:
+            return True
+        seen = seen.__cause__ or getattr(seen, "orig", None)
+    return False
 
 
 # ------------------------------------------------------------------
@@ -149,16 +173,61 @@ async def bulk_insert_health_records(
     session: AsyncSession,
     records: list[dict[str, Any]],
 ) -> int:
-    """Bulk-insert HealthRecord dicts using COPY, skipping conflicts."""
-    rows = [
-        tuple(r[c] for c in _HEALTH_COLS)
-        for r in records
-    ]
+    """Bulk-insert HealthRecord dicts using COPY, skipping conflicts.
+
+    ``time``/``end_time`` must be timezone-aware :class:`datetime` objects (not
+    ISO strings) and ``value`` a number; it is cast to a native ``float`` here
+    so asyncpg's binary COPY encodes every row as a plain float8.
+    """
     return await _copy_upsert(
         session,
         "health_records",
         _HEALTH_COLS,
-        rows,
+        _health_rows(records),
+    )
+
+
+async def bulk_insert_health_records_parallel(
+    session_factory: async_sessionmaker,
+    columns: Mapping[str, Sequence[Any]],
+    *,
+    parallelism: int = 2,
+) -> int:
+    """Bulk-insert HealthRecord rows supplied column-wise, using COPY sharded
+    across *parallelism* sessions.
+
+    *columns* maps every name in ``_HEALTH_COLS`` to an equal-length sequence
+    (times tz-aware datetimes); ``value`` is cast to ``float`` as in
+    :func:`bulk_insert_health_records`. Rows are assembled with one C-level
+    ``zip`` instead of a per-row dict lookup per column; a length mismatch
+    raises ``ValueError``. Each shard commits on its own, so unlike the
+    single-session form there is no caller transaction to roll back.
+    """
+    return await _copy_upsert_parallel(
+        session_factory,
+        "health_records",
+        _HEALTH_COLS,
+        _health_rows_columnar(columns),
+        parallelism=parallelism,
+    )
+
+
+def _health_rows(records: list[dict[str, Any]]) -> list[tuple]:
+    return [
+        (
+            r["time"], r["user_id"], r["metric_type"], float(r["value"]),
+            r["unit"], r["end_time"], r["source_id"], r["batch_id"],
+        )
+        for r in records
+    ]
+
+
+def _health_rows_columnar(columns: Mapping[str, Sequence[Any]]) -> list[tuple]:
+    return list(
+        zip(
+            *(map(float, columns[c]) if c == "value" else columns[c] for c in _HEALTH_COLS),
+            strict=True,
+        )
     )
 
 
@@ -211,22 +280,34 @@ async def bulk_insert_activity_summaries(
     )
 
 
-# Workouts keep parameterised INSERT (JSONB column)
+_WORKOUT_COLS = [
+    "id", "user_id", "time", "end_time", "activity_type", "duration_sec",
+    "total_distance_m", "total_energy_kj", "source_id", "batch_id", "metadata",
+]
+
 
 async def bulk_insert_workouts(
     session: AsyncSession,
     records: list[dict[str, Any]],
 ) -> int:
-    """Bulk-insert Workout dicts, deduplicating on the natural key."""
-    # Serialize metadata dicts to JSON strings for asyncpg
-    for r in records:
-        if "metadata" in r and isinstance(r["metadata"], dict):
-            r["metadata"] = json.dumps(r["metadata"])
-    return await _bulk_upsert(
+    """Bulk-insert Workout dicts using COPY, deduplicating on the natural key.
+
+    ``metadata`` (a dict or ``None``) is serialised here: asyncpg's COPY
+    codec takes JSONB as its JSON text.
+    """
+    rows = [
+        tuple(
+            json.dumps(r[c]) if c == "metadata" and r[c] is not None else r[c]
+            for c in _WORKOUT_COLS
+        )
+        for r in records
+    ]
+    return await _copy_upsert(
         session,
-        Workout,
-        records,
-        conflict_target=["user_id", "time", "activity_type"],
+        "workouts",
+        _WORKOUT_COLS,
+        rows,
+        conflict_target="(user_id, time, activity_type)",
     )
 
 
@@ -237,8 +318,20 @@ async def bulk_insert_workout_route_points(
     session: AsyncSession,
     records: list[dict[str, Any]],
 ) -> int:
-    """Bulk-insert WorkoutRoutePoint dicts using COPY, skipping conflicts."""
-    rows = [tuple(r[c] for c in _ROUTE_POINT_COLS) for r in records]
+    """Bulk-insert WorkoutRoutePoint dicts using COPY, skipping conflicts.
+
+    ``time`` must be a timezone-aware :class:`datetime`; the coordinates are
+    cast to native ``float`` (``altitude_m`` may be ``None``) so asyncpg's
+    binary COPY encodes them as plain float8.
+    """
+    rows = [
+        (
+            r["time"], r["workout_id"], float(r["latitude"]),
+            float(r["longitude"]),
+            None if r["altitude_m"] is None else float(r["altitude_m"]),
+        )
+        for r in records
+    ]
     return await _copy_upsert(
         session,
         "workout_route_points",
@@ -14,8 +14,9 @@ reading it instead. This module owns the rollup's whole lifecycle:
   touched — a targeted recompute, never a full rebuild.
 * :func:`recompute_for_rows` — convenience over :func:`recompute_buckets` that
   extracts the distinct ``(user, metric, day)`` keys from a list of just-inserted
-  ``health_records`` row dicts. The Apple Health XML import and the Connector sync
-  call this after a batch lands.
+  ``health_records`` row dicts. The Connector sync calls this after a batch lands;
+  the Apple Health XML import calls its column-wise twin
+  :func:`recompute_for_columns`.
 * :func:`backfill_all` — the **one-time backfill / rebuild**: a single
   ``GROUP BY user_id, metric_type, date_trunc('day', time)`` over every existing
   row. **Gated**: it skips when ``metric_daily`` is already populated (a cheap
@@ -41,8 +42,10 @@ import asyncio
 import logging
 import os
 import sys
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import date as date_type
+from datetime import datetime
 from datetime import timezone as _tz
 
 from sqlalchemy import func, select, text
@@ -72,6 +75,63 @@ class BackfillResult:
 # --------------------------------------------------------------------------- #
 
 
+# The target keys arrive as three parallel arrays unnested into a relation, so
+# the DELETE and the re-aggregating INSERT both scope to exactly these
+# (user, metric, day) tuples. The SQL text is the same for every batch, however
+# many keys it has: SQLAlchemy compiles it once and asyncpg reuses its prepared
+# statement, and there is no per-key bind parameter to hit asyncpg's 32767 cap.
+_TARGET_KEYS = """
+    unnest(CAST(:user_ids AS integer[]),
+           CAST(:metric_types AS text[]),
+           CAST(:days AS date[])) AS k(user_id, metric_type, day)
+"""
+
+_DELETE_BUCKETS = text(
+    f"""
+    DELETE FROM metric_daily md
+    USING {_TARGET_KEYS}
+    WHERE md.user_id = k.user_id
+      AND md.metric_type = k.metric_type
+      AND md.day = k.day
+    """
+)
+
+_REINSERT_BUCKETS = text(
+    f"""
+    INSERT INTO metric_daily
+        (user_id, metric_type, day, count, sum, min, max, unit)
+    SELECT hr.user_id,
+           hr.metric_type,
+           date_trunc('day', hr.time)::date AS day,
+           count(*),
+           sum(hr.value),
+           min(hr.value),
+           max(hr.value),
+           max(hr.unit)
+    FROM health_records hr
+    JOIN {_TARGET_KEYS}
+      ON hr.user_id = k.user_id
+     AND hr.metric_type = k.metric_type
+     AND date_trunc('day', hr.time)::date = k.day
+    GROUP BY hr.user_id, hr.metric_type, date_trunc('day', hr.time)::date
+    """
+)
+
+
+# Recomputes of the same user are serialised for the rest of the transaction.
+# Without it two concurrent recomputes (an import's consumers flush in
+# parallel) both delete nothing, then both insert the same bucket and the loser
+# fails on metric_daily's primary key. After the wait, READ COMMITTED gives the
+# DELETE/INSERT a fresh snapshot that includes the other side's raw rows.
+# Users are locked in ascending order so multi-user batches can't deadlock.
+_LOCK_USERS = text(
+    """
+    SELECT pg_advisory_xact_lock(hashtext('metric_daily'), u)
+    FROM unnest(CAST(:user_ids AS integer[])) AS u
+    """
+)
+
+
 async def recompute_buckets(
     session: AsyncSession,
     keys: list[tuple[int, str, date_type]],
@@ -91,65 +151,35 @@ async def recompute_buckets(
 
     # De-dup the keys (a batch hits the same (user, metric, day) many times).
     distinct = sorted(set(keys))
+    params = {
+        "user_ids": [uid for uid, _, _ in distinct],
+        "metric_types": [metric for _, metric, _ in distinct],
+        "days": [day for _, _, day in distinct],
+    }
 
-    # Build a VALUES list of the target keys as a CTE so the DELETE and the
-    # re-aggregating INSERT both scope to exactly these (user, metric, day) tuples.
-    # Parameterised positionally to stay clear of any injection.
-    # Explicitly cast every VALUES component: a bare VALUES list gives the columns
-    # no inferable type, so ``k.user_id = md.user_id`` would be ``text = integer``.
-    params: dict[str, object] = {}
-    value_rows = []
-    for i, (uid, metric, day) in enumerate(distinct):
-        params[f"u{i}"] = uid
-        params[f"m{i}"] = metric
-        params[f"d{i}"] = day
-        value_rows.append(
-            f"(CAST(:u{i} AS integer), CAST(:m{i} AS text), CAST(:d{i} AS date))"
-        )
-    values_sql = ", ".join(value_rows)
-
-    # 1) Drop the target buckets.
     await session.execute(
-        text(
-            f"""
-            DELETE FROM metric_daily md
-            USING (VALUES {values_sql}) AS k(user_id, metric_type, day)
-            WHERE md.user_id = k.user_id
-              AND md.metric_type = k.metric_type
-              AND md.day = k.day
-            """
-        ),
-        params,
+        _LOCK_USERS, {"user_ids": sorted({uid for uid, _, _ in distinct})}
     )
 
+    # 1) Drop the target buckets.
+    await session.execute(_DELETE_BUCKETS, params)
+
     # 2) Re-insert fresh aggregates for any target buckets that still have raw rows.
     #    A bucket with zero remaining rows simply produces no row (correctly gone).
-    await session.execute(
-        text(
-            f"""
-            INSERT INTO metric_daily
-                (user_id, metric_type, day, count, sum, min, max, unit)
-            SELECT hr.user_id,
-                   hr.metric_type,
-                   date_trunc('day', hr.time)::date AS day,
-                   count(*),
-                   sum(hr.value),
-                   min(hr.value),
-                   max(hr.value),
-                   max(hr.unit)
-            FROM health_records hr
-            JOIN (VALUES {values_sql}) AS k(user_id, metric_type, day)
-              ON hr.user_id = k.user_id
-             AND hr.metric_type = k.metric_type
-             AND date_trunc('day', hr.time)::date = k.day
-            GROUP BY hr.user_id, hr.metric_type, date_trunc('day', hr.time)::date
-            """
-        ),
-        params,
-    )
+    await session.execute(_REINSERT_BUCKETS, params)
     return len(distinct)
 
 
+def _utc_day(ts: datetime) -> date_type:
+    """The UTC calendar day of *ts*, matching SQL ``date_trunc('day', time)::date``."""
+    # Normalise to UTC before taking the date so it matches date_trunc in a
+    # UTC session. A naive datetime is assumed already-UTC (the parsers emit
+    # tz-aware, but be defensive).
+    if ts.tzinfo is not None:
+        return ts.astimezone(_UTC).date()
+    return ts.date()
+
+
 def _keys_from_rows(
     rows: list[dict],
 ) -> list[tuple[int, str, date_type]]:
@@ -159,18 +189,23 @@ def _keys_from_rows(
     (``user_id`` / ``metric_type`` / ``time``). The day is the UTC calendar day to
     match the SQL ``date_trunc('day', time)::date``.
     """
-    keys: set[tuple[int, str, date_type]] = set()
-    for r in rows:
-        ts = r["time"]
-        # Normalise to UTC before taking the date so it matches date_trunc in a
-        # UTC session. A naive datetime is assumed already-UTC (the parsers emit
-        # tz-aware, but be defensive).
-        if ts.tzinfo is not None:
-            day = ts.astimezone(_UTC).date()
-        else:
-            day = ts.date()
-        keys.add((r["user_id"], r["metric_type"], day))
-    return list(keys)
+    return list(
+        {(r["user_id"], r["metric_type"], _utc_day(r["time"])) for r in rows}
+    )
+
+
+def _keys_from_columns(
+    user_ids: Sequence[int],
+    metric_types: Sequence[str],
+    times: Sequence[datetime],
+) -> list[tuple[int, str, date_type]]:
+    """:func:`_keys_from_rows` for rows held as parallel columns."""
+    return list(
+        {
+            (uid, metric, _utc_day(ts))
+            for uid, metric, ts in zip(user_ids, metric_types, times, strict=True)
+        }
+    )
 
 
 async def recompute_for_rows(session: AsyncSession, rows: list[dict]) -> int:
@@ -182,6 +217,18 @@ async def recompute_for_rows(session: AsyncSession, rows: list[dict]) -> int:
     return await recompute_buckets(session, _keys_from_rows(rows))
 
 
+async def recompute_for_columns(
+    session: AsyncSession,
+    user_ids: Sequence[int],
+    metric_types: Sequence[str],
+    times: Sequence[datetime],
+) -> int:
+    """:func:`recompute_for_rows` for a batch held column-wise (the XML import)."""
+    return await recompute_buckets(
+        session, _keys_from_columns(user_ids, metric_types, times)
+    )
+
+
 # --------------------------------------------------------------------------- #
 # One-time backfill / full rebuild (gated)
 # --------------------------------------------------------------------------- #
@@ -13,18 +13,30 @@ table inserts running in parallel via ``asyncio.gather``.
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import functools
+import hashlib
+import itertools
 import logging
+import mmap
+import multiprocessing
+import os
+import queue as queue_mod
 import re
+import sys
+import threading
 import uuid
+from collections.abc import Iterable, Iterator, Mapping
 from dataclasses import dataclass, field
 from datetime import date as date_type, datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 from lxml import etree
-from sqlalchemy import delete, select, update
+from sqlalchemy import delete, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.config import settings
 from app.models.activity_summary import ActivitySummary
 from app.models.category_record import CategoryRecord
 from app.models.data_source import DataSource
@@ -36,7 +48,7 @@ from app.services import rollup
 from app.services.dedup import (
     bulk_insert_activity_summaries,
     bulk_insert_category_records,
-    bulk_insert_health_records,
+    bulk_insert_health_records_parallel,
     bulk_insert_workout_route_points,
     bulk_insert_workouts,
 )
@@ -46,9 +58,26 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
-BATCH_SIZE = 25_000
+# Rows of one table that trigger handing it to the consumers; the other
+# tables keep filling (workouts and their route points travel together).
+PER_TABLE_BATCH = settings.IMPORT_BATCH_ROWS
 MAX_QUEUE_DEPTH = 8
 NUM_CONSUMERS = 3
+# Distinct date strings remembered per import before the memo is reset.
+DATE_CACHE_SIZE = 4096
+# Concurrent COPY shards per batch for health_records, the dominant table.
+HEALTH_COPY_PARALLELISM = 2
+# Bytes read from export.xml per parser feed.
+PARSE_CHUNK_SIZE = 256 * 1024
+# How often a parser thread blocked on a full hand-off re-checks for a stop.
+_HANDOFF_POLL_SEC = 0.5
+# Exports at least this large are parsed by several processes in parallel.
+PARALLEL_PARSE_MIN_BYTES = 1 << 30
+PARSE_PROCESSES = min(os.cpu_count() or 1, 4)
+# Placeholder source ids each parse process may hand out, keeping them apart.
+_PLACEHOLDER_SPAN = 1_000_000
+# Seconds to let a parse process exit before it is terminated.
+_SHARD_JOIN_TIMEOUT_SEC = 5.0
 
 _APPLE_DATE_RE = re.compile(
     r"(\d{4}-\d{2}-\d{2})\s+(\d{2}:\d{2}:\d{2})\s+([+-]\d{4})"
@@ -62,31 +91,127 @@ _WORKOUT_PREFIX = "HKWorkoutActivityType"
 _KCAL_TO_KJ = 4.184
 _CAL_TO_KJ = 0.004184  # dietary Calorie = kcal, small cal = 1/1000 kcal
 
+# Exact unit strings as Apple writes them -> kJ factor. Hit on every record, so
+# a miss (anything unusual) falls back to the normalising comparison chain.
+_ENERGY_TO_KJ = {"kcal": _KCAL_TO_KJ, "Cal": _KCAL_TO_KJ, "kJ": 1.0}
+
+# Raw HK type identifier -> cleaned name. The vocabulary is a few hundred
+# identifiers, so this is unbounded.
+_TYPE_NAME_CACHE: dict[str, str] = {}
+# Raw <Record> type -> (row kind, cleaned name); same vocabulary as above.
+_RECORD_KIND_CACHE: dict[str, tuple[str | None, str]] = {}
+# Raw HKCategoryValue* -> display label; bounded by Apple's vocabulary.
+_CATEGORY_LABEL_CACHE: dict[str, str] = {}
+
 # Fixed namespace for deterministic workout UUIDs
 _WORKOUT_NS = uuid.UUID("a1b2c3d4-e5f6-7890-abcd-ef1234567890")
+_WORKOUT_NS_BYTES = _WORKOUT_NS.bytes
+# RFC 4122 version-5 / variant bits, applied to the 128-bit SHA-1 prefix.
+_UUID5_CLEAR = ~((0xF000 << 64) | (0xC000 << 48))
+_UUID5_SET = (0x5000 << 64) | (0x8000 << 48)
 
 # Distance conversion factors
 _KM_TO_M = 1_000.0
 _MI_TO_M = 1_609.344
+# Exact distance/duration units as Apple writes them (see ``_ENERGY_TO_KJ``).
+_DISTANCE_TO_M = {"km": _KM_TO_M, "mi": _MI_TO_M, "m": 1.0}
 
 # Duration conversion factors
 _MIN_TO_SEC = 60.0
 _HR_TO_SEC = 3_600.0
+_DURATION_TO_SEC = {"min": _MIN_TO_SEC, "hr": _HR_TO_SEC, "s": 1.0}
+
+# An element's attributes: an lxml element or the attribute mapping a parser
+# target receives. The element processors only ever call ``.get`` on it.
+_Attrs = etree._Element | Mapping[str, str]
 
 # ---------------------------------------------------------------------------
 # BatchPayload
 # ---------------------------------------------------------------------------
 
 
+@dataclass
+class HealthColumns:
+    """Parsed HealthRecord rows held column-wise: one list per field.
+
+    A batch carries tens of thousands of health rows; as parallel lists each
+    row costs one pointer per field instead of a whole dict. Rows go in and
+    out as tuples in :data:`HealthColumns.FIELDS` order, which is the COPY
+    column order :mod:`app.services.dedup` expects.
+    """
+
+    FIELDS = (
+        "time", "user_id", "metric_type", "value", "unit",
+        "end_time", "source_id", "batch_id",
+    )
+
+    time: list[datetime] = field(default_factory=list)
+    user_id: list[int] = field(default_factory=list)
+    metric_type: list[str] = field(default_factory=list)
+    value: list[float] = field(default_factory=list)
+    unit: list[str] = field(default_factory=list)
+    end_time: list[datetime | None] = field(default_factory=list)
+    source_id: list[int | None] = field(default_factory=list)
+    batch_id: list[str | None] = field(default_factory=list)
+
+    @classmethod
+    def from_rows(cls, rows: list[dict[str, Any]]) -> HealthColumns:
+        """Build from HealthRecord row dicts (as the other ingest paths emit)."""
+        cols = cls()
+        for r in rows:
+            cols.append(tuple(r[f] for f in cls.FIELDS))
+        return cols
+
+    def append(self, row: tuple) -> None:
+        """Append one row given as a tuple in :data:`FIELDS` order."""
+        (t, uid, metric, value, unit, end, source, batch) = row
+        self.time.append(t)
+        self.user_id.append(uid)
+        self.metric_type.append(metric)
+        self.value.append(value)
+        self.unit.append(unit)
+        self.end_time.append(end)
+        self.source_id.append(source)
+        self.batch_id.append(batch)
+
+    def columns(self) -> dict[str, list]:
+        """The field name -> column mapping the columnar inserts take."""
+        return {f: getattr(self, f) for f in self.FIELDS}
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+
 @dataclass
 class BatchPayload:
     """A self-contained batch of parsed records ready for DB insertion."""
 
-    health: list[dict[str, Any]] = field(default_factory=list)
+    health: HealthColumns = field(default_factory=HealthColumns)
     category: list[dict[str, Any]] = field(default_factory=list)
     workouts: list[dict[str, Any]] = field(default_factory=list)
     route_points: list[dict[str, Any]] = field(default_factory=list)
     activity: list[dict[str, Any]] = field(default_factory=list)
+    # Set when a row carries a placeholder (negative) source_id that must be
+    # swapped for the real id before insert; see _DataSourceCache.
+    has_placeholders: bool = False
+
+    def split_full(self, limit: int) -> BatchPayload:
+        """Move every table holding *limit* or more rows into a new payload.
+
+        The rest stay here to keep filling, so each table ships in dense
+        batches whatever the export's mix of record types.
+        """
+        full = BatchPayload(has_placeholders=self.has_placeholders)
+        if len(self.health) >= limit:
+            full.health, self.health = self.health, HealthColumns()
+        if len(self.category) >= limit:
+            full.category, self.category = self.category, []
+        if len(self.workouts) >= limit or len(self.route_points) >= limit:
+            full.workouts, self.workouts = self.workouts, []
+            full.route_points, self.route_points = self.route_points, []
+        if len(self.activity) >= limit:
+            full.activity, self.activity = self.activity, []
+        return full
 
     def __len__(self) -> int:
         return (
@@ -108,9 +233,32 @@ def _parse_apple_date(date_str: str | None) -> datetime | None:
 
     Returns a timezone-aware :class:`datetime` or ``None`` when the input is
     missing / unparseable.
+
+    This runs for every date attribute in the export, so the fixed-width layout
+    is checked positionally and sliced straight into ISO form for the C
+    ``fromisoformat``; anything else (extra whitespace, odd separators) falls
+    back to the regex path.
     """
     if not date_str:
         return None
+    if (
+        len(date_str) == 25
+        and date_str[4] == "-"
+        and date_str[10] == " "
+        and date_str[19] == " "
+        and date_str[20] in "+-"
+    ):
+        try:
+            return datetime.fromisoformat(
+                date_str[:10] + "T" + date_str[11:19] + date_str[20:]
+            )
+        except ValueError:
+            pass
+    return _parse_apple_date_slow(date_str)
+
+
+def _parse_apple_date_slow(date_str: str) -> datetime | None:
+    """Regex-validated fallback for :func:`_parse_apple_date`."""
     m = _APPLE_DATE_RE.match(date_str.strip())
     if not m:
         logger.warning("Unparseable date string: %r", date_str)
@@ -123,6 +271,34 @@ def _parse_apple_date(date_str: str | None) -> datetime | None:
         return None
 
 
+_MISSING = object()
+
+
+class _DateCache:
+    """Bounded per-import memo for :func:`_parse_apple_date`.
+
+    Sibling records share timestamps (one sample per metric per second from the
+    same device), so repeats become a dict probe. A full cache is simply
+    cleared: the repeats are local to neighbouring records, and FIFO eviction
+    via ``next(iter(cache))`` degrades badly as a dict's front fills with
+    deleted slots.
+    """
+
+    def __init__(self, maxsize: int = DATE_CACHE_SIZE) -> None:
+        self._maxsize = maxsize
+        self._cache: dict[str | None, datetime | None] = {}
+
+    def parse(self, date_str: str | None) -> datetime | None:
+        cache = self._cache
+        parsed = cache.get(date_str, _MISSING)
+        if parsed is _MISSING:
+            parsed = _parse_apple_date(date_str)
+            if len(cache) >= self._maxsize:
+                cache.clear()
+            cache[date_str] = parsed
+        return parsed
+
+
 def _parse_apple_date_only(date_str: str | None) -> date_type | None:
     """Parse a ``dateComponents`` string (``2024-01-01``) into a date."""
     if not date_str:
@@ -145,6 +321,18 @@ def _parse_iso_datetime(date_str: str | None) -> datetime | None:
         return None
 
 
+def _workout_uuid(dedup_key: str) -> uuid.UUID:
+    """``uuid.uuid5(_WORKOUT_NS, dedup_key)``, computed without its overhead.
+
+    Same SHA-1 and bit layout, so existing workout ids are unchanged; the
+    version/variant bits are masked on the integer instead of via
+    ``uuid5``'s bytes round trip.
+    """
+    digest = hashlib.sha1(_WORKOUT_NS_BYTES + dedup_key.encode()).digest()
+    n = int.from_bytes(digest[:16])
+    return uuid.UUID(int=(n & _UUID5_CLEAR) | _UUID5_SET)
+
+
 def _clean_type_name(raw_type: str, prefix: str) -> str:
     """Strip the HK prefix from a type identifier.
 
@@ -157,6 +345,21 @@ def _clean_type_name(raw_type: str, prefix: str) -> str:
     return raw_type
 
 
+def _cached_type_name(raw_type: str, prefix: str) -> str:
+    """:func:`_clean_type_name` memoized on the raw identifier.
+
+    A raw identifier only ever carries one of the HK prefixes, so the raw
+    string alone is a sufficient key. Names are interned as they enter the
+    cache, so every row of a type shares one string object.
+    """
+    name = _TYPE_NAME_CACHE.get(raw_type)
+    if name is None:
+        name = _TYPE_NAME_CACHE[raw_type] = sys.intern(
+            _clean_type_name(raw_type, prefix)
+        )
+    return name
+
+
 def _clean_category_value(raw_value: str) -> str:
     """Derive a human-readable label from a raw HK category value string.
 
@@ -182,6 +385,34 @@ def _clean_category_value(raw_value: str) -> str:
     return spaced.strip()
 
 
+def _record_kind(record_type: str) -> tuple[str | None, str]:
+    """Classify a ``<Record>`` type once: ``("health" | "category" | None, name)``.
+
+    Memoized on the raw identifier, so the per-record dispatch is one dict
+    probe instead of prefix checks plus a name lookup.
+    """
+    resolved = _RECORD_KIND_CACHE.get(record_type)
+    if resolved is None:
+        if record_type.startswith(_QUANTITY_PREFIX):
+            resolved = ("health", _cached_type_name(record_type, _QUANTITY_PREFIX))
+        elif record_type.startswith(_CATEGORY_PREFIX):
+            resolved = ("category", _cached_type_name(record_type, _CATEGORY_PREFIX))
+        else:
+            resolved = (None, record_type)
+        _RECORD_KIND_CACHE[record_type] = resolved
+    return resolved
+
+
+def _cached_category_label(raw_value: str) -> str:
+    """:func:`_clean_category_value` memoized on the raw value."""
+    label = _CATEGORY_LABEL_CACHE.get(raw_value)
+    if label is None:
+        label = _CATEGORY_LABEL_CACHE[raw_value] = sys.intern(
+            _clean_category_value(raw_value)
+        )
+    return label
+
+
 def _safe_float(value: str | None) -> float | None:
     """Convert a string to float, returning ``None`` on failure."""
     if value is None:
@@ -209,6 +440,9 @@ def _convert_to_kj(value: float | None, unit: str | None) -> float | None:
     """
     if value is None or unit is None:
         return None
+    factor = _ENERGY_TO_KJ.get(unit)
+    if factor is not None:
+        return value * factor
     unit_lower = unit.strip().lower()
     if unit_lower in ("kcal", "cal"):
         return value * _KCAL_TO_KJ
@@ -223,6 +457,9 @@ def _convert_to_meters(value: float | None, unit: str | None) -> float | None:
     """Convert a distance value to meters."""
     if value is None or unit is None:
         return None
+    factor = _DISTANCE_TO_M.get(unit)
+    if factor is not None:
+        return value * factor
     unit_lower = unit.strip().lower()
     if unit_lower == "km":
         return value * _KM_TO_M
@@ -240,6 +477,9 @@ def _convert_duration_to_seconds(
     """Convert a duration to seconds."""
     if value is None or unit is None:
         return None
+    factor = _DURATION_TO_SEC.get(unit)
+    if factor is not None:
+        return value * factor
     unit_lower = unit.strip().lower()
     if unit_lower in ("min", "minute", "minutes"):
         return value * _MIN_TO_SEC
@@ -284,15 +524,20 @@ def _parse_gpx_route_points(
 ) -> list[dict[str, Any]]:
     route_points: list[dict[str, Any]] = []
     try:
-        context = etree.iterparse(str(gpx_path), events=("end",), recover=True)
+        # Only <trkpt> ends reach Python (any namespace); their <time>/<ele>
+        # children are still attached when the event fires.
+        context = etree.iterparse(
+            str(gpx_path),
+            events=("end",),
+            tag="{*}trkpt",
+            recover=True,
+            remove_blank_text=True,
+        )
     except OSError:
         logger.warning("Could not read GPX route file: %s", gpx_path)
         return route_points
 
     for _event, elem in context:
-        if not elem.tag.endswith("trkpt"):
-            continue
-
         point_time = None
         altitude = None
         for child in elem:
@@ -314,12 +559,12 @@ def _parse_gpx_route_points(
                 }
             )
 
-        elem.clear()
-        while elem.getprevious() is not None:
-            parent = elem.getparent()
-            if parent is None:
-                break
-            del parent[0]
+        # fast_iter: free the point and the already-processed siblings before it.
+        elem.clear(keep_tail=True)
+        parent = elem.getparent()
+        if parent is not None:
+            while elem.getprevious() is not None:
+                del parent[0]
 
     return route_points
 
@@ -329,15 +574,79 @@ def _parse_gpx_route_points(
 # ---------------------------------------------------------------------------
 
 
+# Resolves (name, bundle_id) keys to ids in one round trip: the sources that
+# exist plus an insert of the rest. ``bundle_id`` is nullable and NULLs never
+# conflict under the unique constraint, hence the IS NOT DISTINCT FROM probe
+# before the ON CONFLICT guard.
+_RESOLVE_SOURCES = text(
+    """
+    WITH wanted AS (
+        SELECT * FROM unnest(CAST(:names AS text[]),
+                             CAST(:bundle_ids AS text[]),
+                             CAST(:devices AS text[]))
+            AS w(name, bundle_id, device_info)
+    ),
+    existing AS (
+        SELECT ds.id, ds.name, ds.bundle_id
+        FROM data_sources ds
+        JOIN wanted w
+          ON ds.name = w.name AND ds.bundle_id IS NOT DISTINCT FROM w.bundle_id
+    ),
+    created AS (
+        INSERT INTO data_sources (name, bundle_id, device_info)
+        SELECT w.name, w.bundle_id, w.device_info
+        FROM wanted w
+        WHERE NOT EXISTS (
+            SELECT 1 FROM existing e
+            WHERE e.name = w.name AND e.bundle_id IS NOT DISTINCT FROM w.bundle_id
+        )
+        ON CONFLICT (name, bundle_id) DO NOTHING
+        RETURNING id, name, bundle_id
+    )
+    SELECT id, name, bundle_id FROM existing
+    UNION ALL
+    SELECT id, name, bundle_id FROM created
+    """
+)
+
+
 class _DataSourceCache:
     """In-memory cache mapping ``(name, bundle_id)`` to a database ``id``.
 
-    Avoids repeated SELECTs for the same source device during a single import
-    run.
+    Pre-warmed with every existing source, so the parser thread resolves
+    sources with a dict lookup. A source first seen mid-import is handed a
+    negative placeholder id (:meth:`placeholder`) and parsing carries on; the
+    bridge then creates all pending sources in one round trip
+    (:meth:`flush_pending`) and rewrites the batch (:meth:`resolve_batch`).
     """
 
-    def __init__(self) -> None:
+    def __init__(self, placeholder_base: int = 0) -> None:
         self._cache: dict[tuple[str, str | None], int] = {}
+        # Placeholder bookkeeping is shared with the parser thread.
+        self._lock = threading.Lock()
+        self._next_placeholder = placeholder_base - 1
+        self._placeholders: dict[tuple[str, str | None], int] = {}
+        self._placeholder_sources: dict[
+            int, tuple[tuple[str, str | None], str | None]
+        ] = {}
+        self._unsaved: dict[tuple[str, str | None], str | None] = {}
+
+    @classmethod
+    def for_shard(
+        cls, known: dict[tuple[str, str | None], int], shard: int
+    ) -> _DataSourceCache:
+        """A parse process's copy of the warmed cache.
+
+        *shard* (1-based) gives it a placeholder range of its own, so ids from
+        different processes never collide when the bridge adopts them.
+        """
+        cache = cls(placeholder_base=-shard * _PLACEHOLDER_SPAN)
+        cache._cache = known
+        return cache
+
+    def snapshot(self) -> dict[tuple[str, str | None], int]:
+        """The known ``(name, bundle_id) -> id`` mapping, for a parse process."""
+        return dict(self._cache)
 
     async def warm(self, session: AsyncSession) -> None:
         """Pre-load all existing data sources into the cache."""
@@ -352,39 +661,88 @@ class _DataSourceCache:
         key = (name, bundle_id)
         return self._cache.get(key)
 
-    async def get_or_create(
-        self,
-        session: AsyncSession,
-        name: str | None,
-        bundle_id: str | None = None,
-        device_info: str | None = None,
-    ) -> int | None:
-        if not name:
-            return None
+    def placeholder(
+        self, name: str, bundle_id: str | None, device_info: str | None
+    ) -> int:
+        """Return the negative stand-in id for a source not yet in the DB.
 
+        The same key always gets the same placeholder, even after it has been
+        saved, so rows parsed either side of :meth:`flush_pending` agree.
+        """
         key = (name, bundle_id)
-        if key in self._cache:
-            return self._cache[key]
-
-        # Try to find existing
-        stmt = select(DataSource).where(
-            DataSource.name == name,
-            DataSource.bundle_id == bundle_id
-            if bundle_id is not None
-            else DataSource.bundle_id.is_(None),
-        )
-        result = await session.execute(stmt)
-        source = result.scalar_one_or_none()
+        with self._lock:
+            source_id = self._placeholders.get(key)
+            if source_id is None:
+                source_id = self._next_placeholder
+                self._next_placeholder -= 1
+                self._placeholders[key] = source_id
+                self._placeholder_sources[source_id] = (key, device_info)
+                self._unsaved[key] = device_info
+        return source_id
+
+    def placeholders(
+        self,
+    ) -> dict[int, tuple[tuple[str, str | None], str | None]]:
+        """Every placeholder handed out: ``id -> ((name, bundle_id), device)``."""
+        with self._lock:
+            return dict(self._placeholder_sources)
 
-        if source is None:
-            source = DataSource(
-                name=name, bundle_id=bundle_id, device_info=device_info
+    def adopt(
+        self,
+        sources: dict[int, tuple[tuple[str, str | None], str | None]],
+    ) -> None:
+        """Take on placeholders a parse process handed out (see :meth:`for_shard`)."""
+        with self._lock:
+            for source_id, (key, device_info) in sources.items():
+                if source_id in self._placeholder_sources:
+                    continue
+                self._placeholder_sources[source_id] = (key, device_info)
+                if key not in self._cache:
+                    self._unsaved.setdefault(key, device_info)
+
+    async def flush_pending(self, session: AsyncSession) -> None:
+        """Create every source handed a placeholder since the last flush.
+
+        One :data:`_RESOLVE_SOURCES` round trip picks up sources another
+        import created after :meth:`warm` and creates the rest. Should a
+        concurrent import win an insert race, the statement runs once more
+        for the keys it skipped, which are committed (visible) by then.
+        """
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, {}
+
+        for _attempt in range(2):
+            if not unsaved:
+                return
+            keys = list(unsaved)
+            rows = await session.execute(
+                _RESOLVE_SOURCES,
+                {
+                    "names": [name for name, _ in keys],
+                    "bundle_ids": [bundle_id for _, bundle_id in keys],
+                    "devices": list(unsaved.values()),
+                },
             )
-            session.add(source)
-            await session.flush()  # assign id
+            for source_id, name, bundle_id in rows:
+                self._cache[(name, bundle_id)] = source_id
+                unsaved.pop((name, bundle_id), None)
+        if unsaved:
+            raise RuntimeError(f"Could not resolve data sources: {list(unsaved)}")
+
+    def resolve_batch(self, batch: BatchPayload) -> None:
+        """Swap *batch*'s placeholder source ids for the real ones."""
+        cache = self._cache
+        sources = self._placeholder_sources
+
+        def real(source_id: int | None) -> int | None:
+            if source_id is not None and source_id < 0:
+                return cache[sources[source_id][0]]
+            return source_id
 
-        self._cache[key] = source.id
-        return source.id
+        batch.health.source_id = [real(s) for s in batch.health.source_id]
+        for row in (*batch.category, *batch.workouts):
+            row["source_id"] = real(row["source_id"])
+        batch.has_placeholders = False
 
 
 # ---------------------------------------------------------------------------
@@ -393,62 +751,86 @@ class _DataSourceCache:
 
 
 def _process_record_element(
-    elem: etree._Element,
+    elem: _Attrs,
     user_id: int,
     batch_id: str,
     source_id: int | None,
-) -> tuple[str, dict[str, Any]] | None:
-    """Convert a ``<Record>`` element into a categorised dict.
+    parse_date: Callable[[str | None], datetime | None] = _parse_apple_date,
+) -> tuple[str, tuple | dict[str, Any]] | None:
+    """Convert a ``<Record>`` element (or its attributes) into a categorised row.
 
-    Returns ``("health", dict)`` or ``("category", dict)`` or ``None`` if the
-    element cannot be processed.
+    Returns ``("health", tuple)`` (a :class:`HealthColumns` row),
+    ``("category", dict)`` or ``None`` if the element cannot be processed.
+    *parse_date* lets the import pass its :class:`_DateCache`.
     """
-    record_type = elem.get("type", "")
+    kind, type_name = _record_kind(elem.get("type", ""))
+    if kind is None:
+        # Unknown record type -- skip gracefully
+        return None
 
-    start = _parse_apple_date(elem.get("startDate"))
+    start_raw = elem.get("startDate")
+    start = parse_date(start_raw)
     if start is None:
         return None
 
-    end = _parse_apple_date(elem.get("endDate"))
+    # Point samples repeat their start as the end: reuse the parsed value.
+    end_raw = elem.get("endDate")
+    end = start if end_raw == start_raw else parse_date(end_raw)
 
-    if record_type.startswith(_QUANTITY_PREFIX):
+    if kind == "health":
         raw_value = _safe_float(elem.get("value"))
         if raw_value is None:
             return None
         return (
             "health",
-            {
-                "time": start,
-                "end_time": end,
-                "user_id": user_id,
-                "metric_type": _clean_type_name(record_type, _QUANTITY_PREFIX),
-                "value": raw_value,
-                "unit": elem.get("unit", ""),
-                "source_id": source_id,
-                "batch_id": batch_id,
-            },
+            (
+                start,
+                user_id,
+                type_name,
+                raw_value,
+                sys.intern(elem.get("unit", "")),
+                end,
+                source_id,
+                batch_id,
+            ),
         )
 
-    if record_type.startswith(_CATEGORY_PREFIX):
-        raw_value = elem.get("value", "")
-        return (
-            "category",
-            {
-                "time": start,
-                "end_time": end,
-                "user_id": user_id,
-                "category_type": _clean_type_name(
-                    record_type, _CATEGORY_PREFIX
-                ),
-                "value": raw_value,
-                "value_label": _clean_category_value(raw_value),
-                "source_id": source_id,
-                "batch_id": batch_id,
-            },
-        )
+    raw_value = sys.intern(elem.get("value", ""))
+    return (
+        "category",
+        {
+            "time": start,
+            "end_time": end,
+            "user_id": user_id,
+            "category_type": type_name,
+            "value": raw_value,
+            "value_label": _cached_category_label(raw_value),
+            "source_id": source_id,
+            "batch_id": batch_id,
+        },
+    )
 
-    # Unknown record type -- skip gracefully
-    return None
+
+@dataclass
+class _WorkoutChildren:
+    """The nested elements of a ``<Workout>`` the import reads, as attributes.
+
+    Only the schema's own places count: ``MetadataEntry`` directly under the
+    workout, ``FileReference`` / ``Location`` directly under its routes (a
+    route's own ``MetadataEntry`` is not workout metadata).
+    """
+
+    metadata: list[_Attrs] = field(default_factory=list)
+    file_refs: list[_Attrs] = field(default_factory=list)
+    locations: list[_Attrs] = field(default_factory=list)
+
+    @classmethod
+    def from_element(cls, elem: etree._Element) -> _WorkoutChildren:
+        children = cls(metadata=list(elem.iterchildren("MetadataEntry")))
+        for route in elem.iterchildren("WorkoutRoute"):
+            children.file_refs.extend(route.iterchildren("FileReference"))
+            children.locations.extend(route.iterchildren("Location"))
+        return children
 
 
 def _process_workout_element(
@@ -457,37 +839,60 @@ def _process_workout_element(
     batch_id: str,
     source_id: int | None,
     route_base_dir: Path | None = None,
+    parse_date: Callable[[str | None], datetime | None] = _parse_apple_date,
 ) -> tuple[dict[str, Any], list[dict[str, Any]]]:
     """Convert a ``<Workout>`` element into a workout dict and route points."""
-    start = _parse_apple_date(elem.get("startDate"))
-    end = _parse_apple_date(elem.get("endDate"))
+    return _process_workout(
+        elem, _WorkoutChildren.from_element(elem), user_id, batch_id,
+        source_id, route_base_dir, parse_date,
+    )
+
+
+def _process_workout(
+    attrs: _Attrs,
+    children: _WorkoutChildren,
+    user_id: int,
+    batch_id: str,
+    source_id: int | None,
+    route_base_dir: Path | None = None,
+    parse_date: Callable[[str | None], datetime | None] = _parse_apple_date,
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Convert a workout's attributes and nested entries into a workout dict
+    and route points.
 
-    activity_raw = elem.get("workoutActivityType", "")
-    activity_type = _clean_type_name(activity_raw, _WORKOUT_PREFIX)
+    *parse_date* (the import's :class:`_DateCache`) is used for the workout's
+    own dates only; route ``Location`` timestamps are unique per point, so
+    memoizing them would just evict useful entries.
+    """
+    start = parse_date(attrs.get("startDate"))
+    end = parse_date(attrs.get("endDate"))
+
+    activity_raw = attrs.get("workoutActivityType", "")
+    activity_type = _cached_type_name(activity_raw, _WORKOUT_PREFIX)
 
     # Deterministic UUID from the workout's natural key so re-imports
     # produce the same ID and ON CONFLICT dedup works correctly.
     # Must match the UniqueConstraint: (user_id, time, activity_type).
     dedup_key = f"{user_id}:{start.isoformat() if start else ''}:{activity_type}"
-    workout_id = uuid.uuid5(_WORKOUT_NS, dedup_key)
+    workout_id = _workout_uuid(dedup_key)
 
-    duration_val = _safe_float(elem.get("duration"))
-    duration_unit = elem.get("durationUnit", "min")
+    duration_val = _safe_float(attrs.get("duration"))
+    duration_unit = attrs.get("durationUnit", "min")
     duration_sec = _convert_duration_to_seconds(duration_val, duration_unit)
 
-    distance_val = _safe_float(elem.get("totalDistance"))
-    distance_unit = elem.get("totalDistanceUnit", "km")
+    distance_val = _safe_float(attrs.get("totalDistance"))
+    distance_unit = attrs.get("totalDistanceUnit", "km")
     total_distance_m = _convert_to_meters(distance_val, distance_unit)
 
-    energy_val = _safe_float(elem.get("totalEnergyBurned"))
-    energy_unit = elem.get("totalEnergyBurnedUnit", "kcal")
+    energy_val = _safe_float(attrs.get("totalEnergyBurned"))
+    energy_unit = attrs.get("totalEnergyBurnedUnit", "kcal")
     total_energy_kj = _convert_to_kj(energy_val, energy_unit)
 
     # Collect any nested metadata entries
     metadata: dict[str, str] = {}
-    for meta_elem in elem.iter("MetadataEntry"):
-        key = meta_elem.get("key")
-        val = meta_elem.get("value")
+    for meta in children.metadata:
+        key = meta.get("key")
+        val = meta.get("value")
         if key:
             metadata[key] = val or ""
 
@@ -507,26 +912,25 @@ def _process_workout_element(
 
     route_points: list[dict[str, Any]] = []
     route_file_refs: list[str] = []
-    for route in elem.iter("WorkoutRoute"):
-        for file_ref in route.iter("FileReference"):
-            file_reference = file_ref.get("path") or file_ref.get("filepath")
-            if file_reference:
-                route_file_refs.append(file_reference)
-        for loc in route.iter("Location"):
-            pt_time = _parse_apple_date(loc.get("date"))
-            lat = _safe_float(loc.get("latitude"))
-            lon = _safe_float(loc.get("longitude"))
-            alt = _safe_float(loc.get("altitude"))
-            if pt_time is not None and lat is not None and lon is not None:
-                route_points.append(
-                    {
-                        "time": pt_time,
-                        "workout_id": workout_id,
-                        "latitude": lat,
-                        "longitude": lon,
-                        "altitude_m": alt,
-                    }
-                )
+    for file_ref in children.file_refs:
+        file_reference = file_ref.get("path") or file_ref.get("filepath")
+        if file_reference:
+            route_file_refs.append(file_reference)
+    for loc in children.locations:
+        pt_time = _parse_apple_date(loc.get("date"))
+        lat = _safe_float(loc.get("latitude"))
+        lon = _safe_float(loc.get("longitude"))
+        alt = _safe_float(loc.get("altitude"))
+        if pt_time is not None and lat is not None and lon is not None:
+            route_points.append(
+                {
+                    "time": pt_time,
+                    "workout_id": workout_id,
+                    "latitude": lat,
+                    "longitude": lon,
+                    "altitude_m": alt,
+                }
+            )
 
     if not route_points and route_file_refs:
         for file_reference in route_file_refs:
@@ -540,7 +944,7 @@ def _process_workout_element(
 
 
 def _process_activity_summary_element(
-    elem: etree._Element,
+    elem: _Attrs,
     user_id: int,
     batch_id: str,
 ) -> dict[str, Any] | None:
@@ -568,6 +972,146 @@ def _process_activity_summary_element(
     }
 
 
+class _ExportTarget:
+    """lxml parser target collecting the export's records as plain attributes.
+
+    The parser calls :meth:`start` / :meth:`end` straight from its C event
+    loop, so no element tree is built and there is nothing to clear behind
+    it. Completed ``(tag, attrs, children)`` items accumulate in :attr:`items`
+    until the reader drains them; ``children`` is set for workouts only.
+    """
+
+    def __init__(self) -> None:
+        self.items: list[tuple[str, _Attrs, _WorkoutChildren | None]] = []
+        self._workout: tuple[_Attrs, _WorkoutChildren] | None = None
+        # Nesting level below the open <Workout>; 1 = its direct children.
+        self._depth = 0
+        self._in_route = False
+
+    def start(self, tag: str, attrib: _Attrs) -> None:
+        if tag == "Record" or tag == "ActivitySummary":
+            self.items.append((tag, attrib, None))
+        elif tag == "Workout":
+            self._workout = (attrib, _WorkoutChildren())
+        elif self._workout is not None:
+            self._depth += 1
+            children = self._workout[1]
+            if self._depth == 1:
+                if tag == "MetadataEntry":
+                    children.metadata.append(attrib)
+                elif tag == "WorkoutRoute":
+                    self._in_route = True
+            elif self._depth == 2 and self._in_route:
+                if tag == "Location":
+                    children.locations.append(attrib)
+                elif tag == "FileReference":
+                    children.file_refs.append(attrib)
+
+    def end(self, tag: str) -> None:
+        if self._workout is None:
+            return
+        if self._depth == 0:
+            self.items.append(("Workout", *self._workout))
+            self._workout = None
+            return
+        if self._depth == 1:
+            self._in_route = False
+        self._depth -= 1
+
+    def close(self) -> None:
+        return None
+
+
+def _read_chunks(
+    file_path: str, start: int = 0, end: int | None = None
+) -> Iterator[bytes]:
+    """Read ``file_path[start:end]`` in :data:`PARSE_CHUNK_SIZE` pieces."""
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        remaining = None if end is None else end - start
+        while remaining is None or remaining > 0:
+            chunk = f.read(
+                PARSE_CHUNK_SIZE if remaining is None
+                else min(PARSE_CHUNK_SIZE, remaining)
+            )
+            if not chunk:
+                return
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+
+def _iter_xml_items(
+    chunks: Iterable[bytes],
+) -> Iterator[tuple[str, _Attrs, _WorkoutChildren | None]]:
+    """Yield ``(tag, attrs, children)`` for every record in the XML *chunks*.
+
+    The bytes are fed to a target parser as they come. ``recover=True``
+    tolerates malformed XML (Apple Health exports sometimes contain unescaped
+    characters in attribute values); fatal errors are still raised once the
+    whole document is read.
+    """
+    target = _ExportTarget()
+    parser = etree.XMLParser(target=target, recover=True)
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        items, target.items = target.items, []
+        yield from items
+    parser.close()
+    yield from target.items
+
+    _raise_for_parser_errors(parser.feed_error_log)
+
+
+def _iter_export_items(
+    file_path: str,
+) -> Iterator[tuple[str, _Attrs, _WorkoutChildren | None]]:
+    """Yield ``(tag, attrs, children)`` for every record in *file_path*."""
+    yield from _iter_xml_items(_read_chunks(file_path))
+
+
+def _scan_offsets(
+    file_path: str, shards: int
+) -> tuple[bytes, list[tuple[int, int]]] | None:
+    """Split an export into up to *shards* byte ranges on record boundaries.
+
+    Returns the document header (everything up to and including the
+    ``<HealthData ...>`` start tag) and the ``(start, end)`` ranges of its
+    body; each range, wrapped in the header and a closing tag, is a
+    well-formed export of its own. Cuts land on the start tags of
+    ``<HealthData>``'s direct children, which Apple writes one per line
+    indented by a single space (nested elements are indented further).
+    Returns ``None`` when the file doesn't have that shape.
+    """
+    with open(file_path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        root = mm.find(b"<HealthData")
+        if root < 0:
+            return None
+        body = mm.find(b">", root) + 1
+        end = mm.rfind(b"</HealthData>")
+        if body <= 0 or end < body:
+            return None
+
+        cuts = [body]
+        for k in range(1, shards):
+            pos = max(cuts[-1], body + (end - body) * k // shards)
+            cut = -1
+            while (line := mm.find(b"\n <", pos, end)) >= 0:
+                if mm[line + 3 : line + 4] != b"/":
+                    cut = line + 1
+                    break
+                pos = line + 1
+            if cut < 0:
+                break
+            if cut > cuts[-1]:
+                cuts.append(cut)
+        cuts.append(end)
+        return mm[:body], list(zip(cuts, cuts[1:]))
+
+
 def _raise_for_parser_errors(error_log: etree._ListErrorLog) -> None:
     fatal_errors = [
         entry for entry in error_log
@@ -589,19 +1133,21 @@ def _raise_for_parser_errors(error_log: etree._ListErrorLog) -> None:
 # ---------------------------------------------------------------------------
 
 
-async def _producer(
-    file_path: str,
+def _build_batches(
+    items: Iterable[tuple[str, _Attrs, _WorkoutChildren | None]],
     user_id: int,
     batch_id: str,
-    db_session_factory: async_sessionmaker,
-    queue: asyncio.Queue[BatchPayload | None],
-    num_consumers: int,
-    cancelled: list[bool],
+    route_base_dir: Path,
     source_cache: _DataSourceCache,
+    hand_off: Callable[[BatchPayload], bool],
+    is_cancelled: Callable[[], bool],
 ) -> int:
-    """Parse the XML file and enqueue batches for consumers.
+    """Turn parsed export *items* into batches, passing each to *hand_off*.
 
-    Returns the total number of records parsed.
+    Runs without touching the event loop or the DB: sources missing from the
+    pre-warmed cache get placeholder ids for the bridge to resolve. Stops
+    early once *hand_off* returns ``False`` or *is_cancelled*. Returns the
+    total number of records parsed.
     """
     batch = BatchPayload()
     total_count = 0
@@ -611,56 +1157,46 @@ async def _producer(
     route_point_count = 0
     activity_count = 0
     skipped_workouts = 0
-    route_base_dir = Path(file_path).resolve().parent
-
-    # Use recover=True to tolerate malformed XML (Apple Health exports
-    # sometimes contain unescaped characters in attribute values).
-    context = etree.iterparse(
-        file_path,
-        events=("end",),
-        tag=("Record", "Workout", "ActivitySummary"),
-        recover=True,
-    )
-
-    for _event, elem in context:
-        tag = elem.tag
+    parse_date = _DateCache().parse
 
+    for tag, attrs, children in items:
         # -- Resolve DataSource (shared across record types) ---------------
-        source_name = elem.get("sourceName")
-        bundle_id = elem.get("sourceVersion")  # close proxy
-        device_info = elem.get("device")
+        source_name = attrs.get("sourceName")
+        bundle_id = attrs.get("sourceVersion")  # close proxy
 
-        # Fast path: check in-memory cache before touching DB
         source_id = source_cache.lookup(source_name, bundle_id)
         if source_id is None and source_name:
-            async with db_session_factory() as session:
-                source_id = await source_cache.get_or_create(
-                    session, source_name, bundle_id, device_info
-                )
-                await session.commit()
+            source_id = source_cache.placeholder(
+                source_name, bundle_id, attrs.get("device")
+            )
+            batch.has_placeholders = True
 
+        full = False
         if tag == "Record":
             result = _process_record_element(
-                elem, user_id, batch_id, source_id
+                attrs, user_id, batch_id, source_id, parse_date
             )
             if result is not None:
                 kind, data = result
                 if kind == "health":
                     batch.health.append(data)
                     health_count += 1
+                    full = len(batch.health) >= PER_TABLE_BATCH
                 else:
                     batch.category.append(data)
                     category_count += 1
+                    full = len(batch.category) >= PER_TABLE_BATCH
                 total_count += 1
 
         elif tag == "Workout":
-            workout, route_points = _process_workout_element(
-                elem, user_id, batch_id, source_id, route_base_dir
+            workout, route_points = _process_workout(
+                attrs, children, user_id, batch_id, source_id,
+                route_base_dir, parse_date,
             )
             if workout["time"] is None:
                 logger.warning(
                     "Skipping workout with unparseable startDate: %s",
-                    elem.get("startDate"),
+                    attrs.get("startDate"),
                 )
                 skipped_workouts += 1
             else:
@@ -669,53 +1205,335 @@ async def _producer(
                 workout_count += 1
                 route_point_count += len(route_points)
                 total_count += 1
+                full = (
+                    len(batch.workouts) >= PER_TABLE_BATCH
+                    or len(batch.route_points) >= PER_TABLE_BATCH
+                )
 
         elif tag == "ActivitySummary":
-            summary = _process_activity_summary_element(elem, user_id, batch_id)
+            summary = _process_activity_summary_element(
+                attrs, user_id, batch_id
+            )
             if summary is not None:
                 batch.activity.append(summary)
                 activity_count += 1
                 total_count += 1
+                full = len(batch.activity) >= PER_TABLE_BATCH
 
-        # -- Yield to event loop periodically so consumers can work ----------
-        if total_count > 0 and total_count % 2000 == 0:
-            await asyncio.sleep(0)
-
-        # -- Enqueue when batch is full ------------------------------------
-        if len(batch) >= BATCH_SIZE:
-            await queue.put(batch)
-            batch = BatchPayload()
-            if cancelled[0]:
+        # -- Hand off a table as soon as it fills --------------------------
+        if full:
+            if not hand_off(batch.split_full(PER_TABLE_BATCH)):
+                return total_count
+            if is_cancelled():
                 break
 
-        # -- Free memory: clear element and preceding siblings -------------
-        elem.clear()
-        while elem.getprevious() is not None:
-            parent = elem.getparent()
-            if parent is None:
-                break
-            del parent[0]
+    # Hand off any remaining records
+    if len(batch) > 0 and not is_cancelled():
+        hand_off(batch)
 
-    _raise_for_parser_errors(context.error_log)
+    logger.info(
+        "Parsing complete: %d health, %d category, %d workouts (%d route pts), "
+        "%d activity summaries, %d total (%d workouts skipped)",
+        health_count, category_count, workout_count, route_point_count,
+        activity_count, total_count, skipped_workouts,
+    )
 
-    # Enqueue any remaining records
-    if len(batch) > 0 and not cancelled[0]:
-        await queue.put(batch)
+    return total_count
+
+
+def _parse_to_queue(
+    file_path: str,
+    user_id: int,
+    batch_id: str,
+    source_cache: _DataSourceCache,
+    handoff: queue_mod.Queue[BatchPayload | None],
+    cancelled: list[bool],
+    stop: threading.Event,
+) -> int:
+    """Parse the XML file on the calling (worker) thread into *handoff*.
+
+    Always ends the stream with ``None``. Returns the total number of
+    records parsed.
+    """
+
+    def hand_off(payload: BatchPayload | None) -> bool:
+        while not stop.is_set():
+            try:
+                handoff.put(payload, timeout=_HANDOFF_POLL_SEC)
+                return True
+            except queue_mod.Full:
+                continue
+        return False
+
+    try:
+        return _build_batches(
+            _iter_export_items(file_path), user_id, batch_id,
+            Path(file_path).resolve().parent, source_cache,
+            hand_off, lambda: cancelled[0],
+        )
+    finally:
+        # End of stream. If the bridge has gone, still wake the reader thread
+        # it may have left blocked on the hand-off.
+        if not hand_off(None):
+            with contextlib.suppress(queue_mod.Full):
+                handoff.put_nowait(None)
+
+
+def _parse_shard(
+    file_path: str,
+    header: bytes,
+    start: int,
+    end: int,
+    shard: int,
+    user_id: int,
+    batch_id: str,
+    known_sources: dict[tuple[str, str | None], int],
+    out: multiprocessing.Queue,
+    stop: Any,
+) -> None:
+    """Parse one :func:`_scan_offsets` range of the export in a child process.
+
+    Sends ``("batch", payload, placeholders)`` messages to *out*, then always
+    a final ``("done", shard, total_count, error_message_or_None)``.
+    """
+    source_cache = _DataSourceCache.for_shard(known_sources, shard)
+
+    def hand_off(payload: BatchPayload) -> bool:
+        sources = source_cache.placeholders() if payload.has_placeholders else {}
+        while not stop.is_set():
+            try:
+                out.put(("batch", payload, sources), timeout=_HANDOFF_POLL_SEC)
+                return True
+            except queue_mod.Full:
+                continue
+        return False
+
+    total_count = 0
+    error = None
+    try:
+        chunks = itertools.chain(
+            (header,), _read_chunks(file_path, start, end), (b"</HealthData>",)
+        )
+        total_count = _build_batches(
+            _iter_xml_items(chunks), user_id, batch_id,
+            Path(file_path).resolve().parent, source_cache,
+            hand_off, stop.is_set,
+        )
+    except Exception as exc:
+        error = str(exc) or type(exc).__name__
+    finally:
+        out.put(("done", shard, total_count, error))
+
+
+async def _forward_batch(
+    batch: BatchPayload,
+    db_session_factory: async_sessionmaker,
+    source_cache: _DataSourceCache,
+    queue: asyncio.Queue[BatchPayload | None],
+) -> None:
+    """Create any new DataSources *batch* references, then enqueue it."""
+    if batch.has_placeholders:
+        async with db_session_factory() as session:
+            await source_cache.flush_pending(session)
+            await session.commit()
+        source_cache.resolve_batch(batch)
+    await queue.put(batch)
+
+
+async def _producer(
+    file_path: str,
+    user_id: int,
+    batch_id: str,
+    db_session_factory: async_sessionmaker,
+    queue: asyncio.Queue[BatchPayload | None],
+    num_consumers: int,
+    cancelled: list[bool],
+    source_cache: _DataSourceCache,
+) -> int:
+    """Parse the XML file off the event loop and enqueue batches for consumers.
+
+    Exports of at least :data:`PARALLEL_PARSE_MIN_BYTES` are split into
+    shards parsed by up to :data:`PARSE_PROCESSES` processes
+    (:func:`_produce_sharded`); smaller ones are parsed on a worker thread
+    (:func:`_produce_threaded`).
+
+    Returns the total number of records parsed.
+    """
+    layout = None
+    if PARSE_PROCESSES > 1 and os.path.getsize(file_path) >= PARALLEL_PARSE_MIN_BYTES:
+        layout = _scan_offsets(file_path, PARSE_PROCESSES)
+
+    if layout is not None and len(layout[1]) > 1:
+        header, ranges = layout
+        total_count = await _produce_sharded(
+            file_path, header, ranges, user_id, batch_id,
+            db_session_factory, queue, cancelled, source_cache,
+        )
+    else:
+        total_count = await _produce_threaded(
+            file_path, user_id, batch_id,
+            db_session_factory, queue, cancelled, source_cache,
+        )
 
     # Send poison pills so each consumer knows to stop
     for _ in range(num_consumers):
         await queue.put(None)
 
-    logger.info(
-        "Parsing complete: %d health, %d category, %d workouts (%d route pts), "
-        "%d activity summaries, %d total (%d workouts skipped)",
-        health_count, category_count, workout_count, route_point_count,
-        activity_count, total_count, skipped_workouts,
+    return total_count
+
+
+async def _produce_threaded(
+    file_path: str,
+    user_id: int,
+    batch_id: str,
+    db_session_factory: async_sessionmaker,
+    queue: asyncio.Queue[BatchPayload | None],
+    cancelled: list[bool],
+    source_cache: _DataSourceCache,
+) -> int:
+    """Parse on a worker thread, bridging its one-slot hand-off onto *queue*.
+
+    The CPU-bound parse runs in :func:`_parse_to_queue` off the event loop,
+    so consumers flush concurrently instead of waiting for the parser to
+    yield.
+    """
+    loop = asyncio.get_running_loop()
+    handoff: queue_mod.Queue[BatchPayload | None] = queue_mod.Queue(maxsize=1)
+    stop = threading.Event()
+    parsing = loop.run_in_executor(
+        None, _parse_to_queue, file_path, user_id, batch_id,
+        source_cache, handoff, cancelled, stop,
     )
 
+    try:
+        while (batch := await loop.run_in_executor(None, handoff.get)) is not None:
+            await _forward_batch(batch, db_session_factory, source_cache, queue)
+    finally:
+        # Unblocks the parser if this task failed or was cancelled.
+        stop.set()
+
+    return await parsing
+
+
+async def _produce_sharded(
+    file_path: str,
+    header: bytes,
+    ranges: list[tuple[int, int]],
+    user_id: int,
+    batch_id: str,
+    db_session_factory: async_sessionmaker,
+    queue: asyncio.Queue[BatchPayload | None],
+    cancelled: list[bool],
+    source_cache: _DataSourceCache,
+) -> int:
+    """Parse each range in its own process, funnelling batches onto *queue*.
+
+    Every process starts from a snapshot of the warmed source cache and hands
+    out placeholders from its own id range; the bridge adopts them and
+    creates the sources before a batch reaches the consumers. Raises
+    ``ValueError`` if any shard fails to parse, or if its process dies without
+    reporting (checked whenever *out* stays empty for a poll interval).
+    """
+    loop = asyncio.get_running_loop()
+    ctx = multiprocessing.get_context("spawn")
+    out = ctx.Queue(maxsize=MAX_QUEUE_DEPTH)
+    stop = ctx.Event()
+    known_sources = source_cache.snapshot()
+    workers = [
+        ctx.Process(
+            target=_parse_shard,
+            args=(
+                file_path, header, start, end, shard, user_id, batch_id,
+                known_sources, out, stop,
+            ),
+            name=f"xml-parse-{shard}",
+            daemon=True,
+        )
+        for shard, (start, end) in enumerate(ranges, start=1)
+    ]
+    for worker in workers:
+        worker.start()
+    logger.info("Parsing %s in %d processes", file_path, len(workers))
+
+    total_count = 0
+    errors: list[str] = []
+    read = functools.partial(out.get, timeout=_HANDOFF_POLL_SEC)
+    try:
+        pending = dict(enumerate(workers, start=1))
+        # Shards seen dead before their "done" arrived. A shard that sent
+        # "done" and exited between a timed-out read and the liveness check
+        # is delivered by the next read, so only a second empty poll is fatal.
+        silent: set[int] = set()
+        while pending:
+            try:
+                message = await loop.run_in_executor(None, read)
+            except queue_mod.Empty:
+                _check_shards(pending, silent, workers)
+                continue
+            if message[0] == "done":
+                _, shard, count, error = message
+                del pending[shard]
+                total_count += count
+                if error is not None:
+                    errors.append(error)
+                    stop.set()
+                continue
+            if stop.is_set():
+                continue
+            _, batch, sources = message
+            if sources:
+                source_cache.adopt(sources)
+            await _forward_batch(batch, db_session_factory, source_cache, queue)
+            if cancelled[0]:
+                stop.set()
+    finally:
+        # Unblocks the parsers if this task failed or was cancelled.
+        stop.set()
+        await loop.run_in_executor(None, _reap_shards, workers, out)
+
+    if errors:
+        raise ValueError(errors[0])
     return total_count
 
 
+def _check_shards(
+    pending: dict[int, multiprocessing.process.BaseProcess],
+    silent: set[int],
+    workers: list[multiprocessing.process.BaseProcess],
+) -> None:
+    """Fail the parse if a pending shard's process has died without reporting.
+
+    Terminates the remaining shards before raising ``ValueError``.
+    """
+    for shard, worker in pending.items():
+        if worker.is_alive():
+            continue
+        if shard not in silent:
+            silent.add(shard)
+            continue
+        for other in workers:
+            if other.is_alive():
+                other.terminate()
+        raise ValueError(
+            f"Parse process {worker.name} exited with code {worker.exitcode} "
+            "before finishing"
+        )
+
+
+def _reap_shards(
+    workers: list[multiprocessing.process.BaseProcess],
+    out: multiprocessing.Queue,
+) -> None:
+    """Join the parse processes, terminating any that don't exit in time."""
+    for worker in workers:
+        worker.join(_SHARD_JOIN_TIMEOUT_SEC)
+        if worker.is_alive():
+            worker.terminate()
+            worker.join()
+    out.cancel_join_thread()
+    out.close()
+
+
 async def _consumer(
     consumer_id: int,
     db_session_factory: async_sessionmaker,
@@ -750,40 +1568,22 @@ async def _flush_batch(
 ) -> None:
     """Persist one batch, isolating each table insert so individual failures
     don't prevent other record types from being saved.
-    """
-    for label, insert_fn, rows in [
-        ("health_records", bulk_insert_health_records, batch.health),
-        ("category_records", bulk_insert_category_records, batch.category),
-        ("activity_summaries", bulk_insert_activity_summaries, batch.activity),
-    ]:
-        if rows:
-            try:
-                await _insert_table(db_session_factory, insert_fn, rows)
-            except Exception:
-                logger.exception("Failed to insert %d %s", len(rows), label)
 
-    # Keep the daily rollups fresh for the (user, metric, day) buckets this batch
-    # touched (ADR-0009) — a targeted recompute, not a full rebuild. Isolated in
-    # its own session and never allowed to break the import (the rollup is derived
-    # data; a full rebuild is the recovery path).
-    if batch.health:
-        try:
-            await _refresh_rollups(db_session_factory, batch.health)
-        except Exception:
-            logger.exception(
-                "Failed to refresh metric_daily rollups for %d health rows",
-                len(batch.health),
-            )
-
-    # Workouts + route points (FK dependency) handled together
-    if batch.workouts:
-        try:
-            await _insert_workouts_and_routes(db_session_factory, batch.workouts, batch.route_points)
-        except Exception:
-            logger.exception(
-                "Failed to insert %d workouts (%d route points)",
-                len(batch.workouts), len(batch.route_points),
-            )
+    The tables share no FK dependency (route points aside, which wait on their
+    workouts), so each insert runs concurrently on its own pooled connection.
+    """
+    await asyncio.gather(
+        _flush_health(db_session_factory, batch.health),
+        _insert_table_logged(
+            db_session_factory, "category_records",
+            bulk_insert_category_records, batch.category,
+        ),
+        _insert_table_logged(
+            db_session_factory, "activity_summaries",
+            bulk_insert_activity_summaries, batch.activity,
+        ),
+        _flush_workouts(db_session_factory, batch.workouts, batch.route_points),
+    )
 
     logger.debug(
         "Flushed batch: %d health, %d category, %d workouts, %d route pts, %d activity",
@@ -793,6 +1593,63 @@ async def _flush_batch(
     )
 
 
+async def _flush_health(
+    db_session_factory: async_sessionmaker, rows: HealthColumns
+) -> None:
+    """Insert the batch's health rows, then refresh the rollups they touch."""
+    if not rows:
+        return
+    try:
+        await bulk_insert_health_records_parallel(
+            db_session_factory, rows.columns(), parallelism=HEALTH_COPY_PARALLELISM
+        )
+    except Exception:
+        logger.exception("Failed to insert %d health_records", len(rows))
+
+    # Keep the daily rollups fresh for the (user, metric, day) buckets this batch
+    # touched (ADR-0009) — a targeted recompute, not a full rebuild. Isolated in
+    # its own session and never allowed to break the import (the rollup is derived
+    # data; a full rebuild is the recovery path).
+    try:
+        await _refresh_rollups(db_session_factory, rows)
+    except Exception:
+        logger.exception(
+            "Failed to refresh metric_daily rollups for %d health rows", len(rows)
+        )
+
+
+async def _flush_workouts(
+    db_session_factory: async_sessionmaker,
+    workouts: list[dict[str, Any]],
+    route_points: list[dict[str, Any]],
+) -> None:
+    """Insert workouts + route points (FK dependency) together."""
+    if not workouts:
+        return
+    try:
+        await _insert_workouts_and_routes(db_session_factory, workouts, route_points)
+    except Exception:
+        logger.exception(
+            "Failed to insert %d workouts (%d route points)",
+            len(workouts), len(route_points),
+        )
+
+
+async def _insert_table_logged(
+    db_session_factory: async_sessionmaker,
+    label: str,
+    insert_fn,
+    rows: list[dict[str, Any]],
+) -> None:
+    """:func:`_insert_table`, logging (not raising) a failure for *label*."""
+    if not rows:
+        return
+    try:
+        await _insert_table(db_session_factory, insert_fn, rows)
+    except Exception:
+        logger.exception("Failed to insert %d %s", len(rows), label)
+
+
 async def _insert_table(db_session_factory: async_sessionmaker, insert_fn, rows: list[dict[str, Any]]) -> None:
     """Insert rows into a single table using its own session."""
     async with db_session_factory() as session:
@@ -801,17 +1658,19 @@ async def _insert_table(db_session_factory: async_sessionmaker, insert_fn, rows:
 
 
 async def _refresh_rollups(
-    db_session_factory: async_sessionmaker, health_rows: list[dict[str, Any]]
+    db_session_factory: async_sessionmaker, health_rows: HealthColumns
 ) -> None:
     """Recompute the daily rollup buckets the batch's health rows touched.
 
     Uses its own session (the per-table isolation pattern). Targeted to the
     distinct (user, metric, day) keys in this batch — the raw rows were already
-    committed by :func:`_insert_table`, so the recompute reads the full current
+    committed by the health insert, so the recompute reads the full current
     truth for those buckets.
     """
     async with db_session_factory() as session:
-        await rollup.recompute_for_rows(session, health_rows)
+        await rollup.recompute_for_columns(
+            session, health_rows.user_id, health_rows.metric_type, health_rows.time
+        )
         await session.commit()
 
 
@@ -841,7 +1700,9 @@ async def _progress_reporter(
     """Periodically write the current progress count to import_batches.
 
     Also polls the batch status — when it reads ``"cancelling"`` it sets the
-    shared *cancelled* flag so the producer can exit early.
+    shared *cancelled* flag so the producer can exit early. The status comes
+    back from the progress ``UPDATE ... RETURNING``, so each tick is one
+    statement; a plain SELECT polls it when the count hasn't moved.
     """
     last_reported = -1
     try:
@@ -851,21 +1712,24 @@ async def _progress_reporter(
             try:
                 async with db_session_factory() as session:
                     if current != last_reported:
-                        await session.execute(
+                        result = await session.execute(
                             update(ImportBatch)
                             .where(ImportBatch.id == batch_id)
                             .values(record_count=current)
+                            .returning(ImportBatch.status)
                         )
+                        status = result.scalar_one_or_none()
                         await session.commit()
                         last_reported = current
+                    else:
+                        result = await session.execute(
+                            select(ImportBatch.status).where(
+                                ImportBatch.id == batch_id
+                            )
+                        )
+                        status = result.scalar_one_or_none()
 
                     # Check for cancellation request
-                    result = await session.execute(
-                        select(ImportBatch.status).where(
-                            ImportBatch.id == batch_id
-                        )
-                    )
-                    status = result.scalar_one_or_none()
                     if status == "cancelling":
                         cancelled[0] = True
                         return
@@ -0,0 +1,184 @@
+"""Time-series and dashboard aggregation helpers (``app.services.aggregation``)."""
+
+from __future__ import annotations
+
+from contextlib import aclosing
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql
+
+from app.models.activity_summary import ActivitySummary
+from app.models.category_record import CategoryRecord
+from app.models.health_record import HealthRecord
+from app.models.user import User
+from app.models.workout import Workout
+from app.services import aggregation
+from app.services.aggregation import (
+    _agg_func,
+    get_dashboard_summary,
+    query_category,
+    query_metric,
+)
+
+
+@pytest.mark.parametrize("name", ["avg", "sum", "min", "max", "count"])
+def test_agg_func_maps_each_name_to_its_sql_aggregate(name: str) -> None:
+    expr = _agg_func(name)(HealthRecord.value)
+
+    sql = str(expr.compile(dialect=postgresql.dialect()))
+    assert sql == f"{name}(health_records.value)"
+
+
+def test_agg_func_rejects_unknown_names() -> None:
+    with pytest.raises(ValueError, match="Unknown aggregate 'median'"):
+        _agg_func("median")
+
+
+# --------------------------------------------------------------------------- #
+# Streaming time-series queries
+# --------------------------------------------------------------------------- #
+
+
+async def _seed(db) -> User:
+    user = User(email="alice@example.com")
+    db.add(user)
+    await db.flush()
+    for day in range(1, 6):
+        for hour in (8, 20):
+            db.add(
+                HealthRecord(
+                    time=datetime(2024, 1, day, hour, tzinfo=timezone.utc),
+                    user_id=user.id,
+                    metric_type="HeartRate",
+                    value=float(60 + day + hour),
+                    unit="count/min",
+                )
+            )
+        db.add(
+            CategoryRecord(
+                time=datetime(2024, 1, day, 23, tzinfo=timezone.utc),
+                end_time=datetime(2024, 1, day + 1, 7, tzinfo=timezone.utc),
+                user_id=user.id,
+                category_type="SleepAnalysis",
+                value="HKCategoryValueSleepAnalysisAsleepCore",
+                value_label="Sleep Analysis Asleep Core",
+            )
+        )
+    await db.commit()
+    return user
+
+
+def test_time_series_queries_reject_bad_arguments_at_call_time() -> None:
+    # No session is touched: the error comes before any iterator exists.
+    with pytest.raises(ValueError, match="Invalid resolution"):
+        query_metric(None, 1, "HeartRate", resolution="fortnight")
+    with pytest.raises(ValueError, match="Unknown aggregate"):
+        query_metric(None, 1, "HeartRate", aggregate="median")
+    with pytest.raises(ValueError, match="Invalid resolution"):
+        query_category(None, 1, "SleepAnalysis", resolution="fortnight")
+
+
+async def test_query_metric_streams_buckets_in_partitions(db_session, monkeypatch) -> None:
+    db = db_session
+    user = await _seed(db)
+    monkeypatch.setattr(aggregation, "_STREAM_PARTITION_SIZE", 2)
+
+    partitions = [
+        p async for p in query_metric(db, user.id, "HeartRate", aggregate="max")
+    ]
+
+    assert [len(p) for p in partitions] == [2, 2, 1]
+    rows = [row for p in partitions for row in p]
+    assert [row["bucket"].day for row in rows] == [1, 2, 3, 4, 5]
+    assert [row["value"] for row in rows] == [81.0, 82.0, 83.0, 84.0, 85.0]
+    assert all(row["count"] == 2 for row in rows)
+
+
+async def test_query_category_streams_buckets_in_partitions(db_session, monkeypatch) -> None:
+    db = db_session
+    user = await _seed(db)
+    monkeypatch.setattr(aggregation, "_STREAM_PARTITION_SIZE", 3)
+
+    partitions = [p async for p in query_category(db, user.id, "SleepAnalysis")]
+
+    assert [len(p) for p in partitions] == [3, 2]
+    rows = [row for p in partitions for row in p]
+    assert [row["bucket"].day for row in rows] == [1, 2, 3, 4, 5]
+    assert {(row["value_label"], row["count"]) for row in rows} == {
+        ("Sleep Analysis Asleep Core", 1)
+    }
+
+
+async def test_stream_closed_early_releases_the_session(db_session, monkeypatch) -> None:
+    db = db_session
+    user = await _seed(db)
+    monkeypatch.setattr(aggregation, "_STREAM_PARTITION_SIZE", 1)
+
+    async with aclosing(query_metric(db, user.id, "HeartRate")) as stream:
+        first = await anext(stream)
+    assert len(first) == 1
+
+    # The cursor is gone, so the session can run the next query.
+    count = (await db.execute(select(func.count()).select_from(HealthRecord))).scalar_one()
+    assert count == 10
+
+
+# --------------------------------------------------------------------------- #
+# Dashboard summary
+# --------------------------------------------------------------------------- #
+
+
+async def test_dashboard_summary_filters_each_aggregate_to_its_metric(db_session) -> None:
+    db = db_session
+    user = User(email="alice@example.com")
+    other = User(email="bob@example.com")
+    db.add_all([user, other])
+    await db.flush()
+    day = date(2024, 3, 10)
+
+    def at(hour: int, d: date = day) -> datetime:
+        return datetime(d.year, d.month, d.day, hour, tzinfo=timezone.utc)
+
+    for uid, metric, hour, value in [
+        (user.id, "StepCount", 8, 1200.0),
+        (user.id, "StepCount", 18, 800.0),
+        (user.id, "ActiveEnergyBurned", 9, 150.5),
+        (user.id, "ActiveEnergyBurned", 19, 49.5),
+        (user.id, "HeartRate", 7, 55.0),
+        (user.id, "HeartRate", 12, 100.0),
+        (user.id, "HeartRate", 22, 70.0),
+        # Outside the three FILTERs, the day, or the user: must not count.
+        (user.id, "BodyMass", 8, 80.0),
+        (other.id, "StepCount", 8, 9999.0),
+        (other.id, "HeartRate", 8, 180.0),
+    ]:
+        db.add(HealthRecord(time=at(hour), user_id=uid, metric_type=metric, value=value, unit="u"))
+    db.add(HealthRecord(time=at(8, date(2024, 3, 11)), user_id=user.id, metric_type="StepCount", value=5000.0, unit="count"))
+    db.add(Workout(user_id=user.id, time=at(10), activity_type="Running"))
+    db.add(ActivitySummary(date=day, user_id=user.id, exercise_minutes=35.0, stand_hours=9))
+    await db.commit()
+
+    summary = await get_dashboard_summary(db, user.id, day)
+
+    assert summary["steps"] == 2000.0
+    assert summary["active_energy_kj"] == 200.0
+    assert (summary["heart_rate_avg"], summary["heart_rate_min"], summary["heart_rate_max"]) == (75.0, 55.0, 100.0)
+    assert summary["workouts"] == 1
+    assert summary["activity_summary"]["exercise_minutes"] == 35.0
+    assert summary["activity_summary"]["stand_hours"] == 9
+
+
+async def test_dashboard_summary_of_an_empty_day(db_session) -> None:
+    db = db_session
+    user = User(email="alice@example.com")
+    db.add(user)
+    await db.commit()
+
+    summary = await get_dashboard_summary(db, user.id, date(2024, 3, 10))
+
+    assert (summary["steps"], summary["active_energy_kj"], summary["workouts"]) == (0.0, 0.0, 0)
+    assert summary["heart_rate_avg"] is None
+    assert summary["heart_rate_min"] is None and summary["heart_rate_max"] is None
+    assert summary["activity_summary"] is None
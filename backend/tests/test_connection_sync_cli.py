@@ -12,7 +12,6 @@
 import contextlib
 import datetime as dt
 
-import pytest
 from cryptography.fernet import Fernet
 from sqlalchemy import func, select
 
@@ -24,6 +24,7 @@ from cryptography.fernet import Fernet
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy import func, select
 
+from app.config import settings
 from app.core.dependencies import get_current_user
 from app.database import get_db
 from app.main import app
@@ -60,9 +61,11 @@ async def _make_user(db, email: str) -> User:
 
 @pytest.fixture(autouse=True)
 def _configure_key(monkeypatch):
-    """Configure an encryption key for the API's cipher dependency by default."""
-    from app.config import settings
+    """Configure an encryption key for the API's cipher dependency by default.
 
+    Kept autouse: nearly every test here stores or decrypts a token, and the
+    one that needs no key overrides it.
+    """
     monkeypatch.setattr(settings, "CONNECTION_ENCRYPTION_KEY", _KEY)
 
 
@@ -221,8 +224,6 @@ async def test_validation_error_never_echoes_the_token(client, db_session):
 async def test_connect_returns_503_when_encryption_not_configured(
     client, db_session, monkeypatch
 ):
-    from app.config import settings
-
     monkeypatch.setattr(settings, "CONNECTION_ENCRYPTION_KEY", None)
     alice = await _make_user(db_session, "alice@example.com")
     client.set_user(alice)
@@ -0,0 +1,138 @@
+"""Bulk-insert helpers (COPY staging + ON CONFLICT DO NOTHING)."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import asyncpg
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.health_record import HealthRecord
+from app.models.user import User
+from app.services import dedup
+from app.services.dedup import bulk_insert_health_records_parallel
+
+
+async def _user(db, email: str = "alice@example.com") -> User:
+    u = User(email=email)
+    db.add(u)
+    await db.flush()
+    return u
+
+
+async def test_columnar_health_insert_matches_row_order_and_casts_value(db_session) -> None:
+    db = db_session
+    user = await _user(db)
+    await db.commit()
+    factory = async_sessionmaker(bind=db.bind, expire_on_commit=False)
+    t0 = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
+    times = [t0 + timedelta(minutes=i) for i in range(3)]
+
+    inserted = await bulk_insert_health_records_parallel(
+        factory,
+        {
+            "time": times,
+            "user_id": [user.id] * 3,
+            "metric_type": ["HeartRate"] * 3,
+            # Not all floats: binary COPY rejects a str, so value is cast first.
+            "value": [61.0, "62", Decimal("63.5")],
+            "unit": ["count/min"] * 3,
+            "end_time": [None] * 3,
+            "source_id": [None] * 3,
+            "batch_id": [None] * 3,
+        },
+        parallelism=2,
+    )
+
+    assert inserted == 3
+    rows = (
+        await db.execute(select(HealthRecord).order_by(HealthRecord.time))
+    ).scalars().all()
+    assert [(r.time, r.value) for r in rows] == list(zip(times, [61.0, 62.0, 63.5]))
+
+
+async def test_columnar_health_insert_rejects_ragged_columns(db_session) -> None:
+    t0 = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
+    with pytest.raises(ValueError):
+        await bulk_insert_health_records_parallel(
+            async_sessionmaker(bind=db_session.bind),
+            {
+                "time": [t0, t0],
+                "user_id": [1],
+                "metric_type": ["HeartRate", "HeartRate"],
+                "value": [61.0, 62.0],
+                "unit": ["u", "u"],
+                "end_time": [None, None],
+                "source_id": [None, None],
+                "batch_id": [None, None],
+            },
+        )
+
+
+def _columns(user_id: int, n: int) -> dict:
+    t0 = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
+    return {
+        "time": [t0 + timedelta(minutes=i) for i in range(n)],
+        "user_id": [user_id] * n,
+        "metric_type": ["HeartRate"] * n,
+        "value": [60.0 + i for i in range(n)],
+        "unit": ["count/min"] * n,
+        "end_time": [None] * n,
+        "source_id": [None] * n,
+        "batch_id": [None] * n,
+    }
+
+
+async def test_parallel_copy_reruns_a_shard_that_lost_a_deadlock(db_session, monkeypatch) -> None:
+    db = db_session
+    user = await _user(db)
+    await db.commit()
+    factory = async_sessionmaker(bind=db.bind, expire_on_commit=False)
+    real_copy = dedup._copy_upsert
+    calls: list[int] = []
+
+    async def deadlock_once(session, table_name, columns, records, **kwargs):
+        calls.append(len(records))
+        if len(calls) == 1:
+            raise asyncpg.exceptions.DeadlockDetectedError("deadlock detected")
+        return await real_copy(session, table_name, columns, records, **kwargs)
+
+    monkeypatch.setattr(dedup, "_copy_upsert", deadlock_once)
+
+    await bulk_insert_health_records_parallel(factory, _columns(user.id, 4), parallelism=2)
+
+    assert calls == [2, 2, 2]  # the first shard ran twice
+    count = (await db.execute(select(func.count()).select_from(HealthRecord))).scalar_one()
+    assert count == 4
+
+
+async def test_parallel_copy_does_not_rerun_other_errors(db_session, monkeypatch) -> None:
+    factory = async_sessionmaker(bind=db_session.bind)
+    calls: list[int] = []
+
+    async def fail(session, table_name, columns, records, **kwargs):
+        calls.append(len(records))
+        raise asyncpg.exceptions.ForeignKeyViolationError("no such user")
+
+    monkeypatch.setattr(dedup, "_copy_upsert", fail)
+
+    with pytest.raises(asyncpg.exceptions.ForeignKeyViolationError):
+        await bulk_insert_health_records_parallel(factory, _columns(1, 2), parallelism=1)
+    assert calls == [2]
+
+
+@pytest.mark.parametrize(
+    ("sqlstate", "expected"), [("40P01", True), ("40001", True), ("23505", False)]
+)
+def test_is_retryable_sees_through_sqlalchemy_wrapping(sqlstate: str, expected: bool) -> None:
+    # SQLAlchemy's asyncpg dialect: DBAPIError -> adapted error -> asyncpg error.
+    adapted = Exception("adapted")
+    adapted.__cause__ = asyncpg.PostgresError.new({"C": sqlstate, "M": "boom"})
+    wrapped = DBAPIError("INSERT ...", None, adapted)
+    wrapped.__cause__ = adapted
+
+    assert dedup._is_retryable(wrapped) is expected
@@ -84,13 +84,14 @@ async def client(db_session):
     app.dependency_overrides.clear()
 
 
-@pytest.fixture(autouse=True)
+@pytest.fixture
 def off_mock(monkeypatch):
     """Force the OFF HTTP call through a per-test MockTransport (never network).
 
     The API's barcode route calls ``off_lookup.lookup_barcode`` without a
     transport; we monkeypatch the module's ``httpx.AsyncClient`` to inject one,
     and count the network calls so cache-hit tests can assert "no extra call".
+    Opt-in: only the barcode tests reach OFF, and each requests it.
     """
     state = {"payload": _NUTELLA, "status": 200, "calls": []}
 
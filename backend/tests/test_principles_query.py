@@ -8,7 +8,6 @@
 - The structured params come back so the generator can read a range by name.
 """
 
-import pytest
 from sqlalchemy import select
 
 from app.models.principle import (
@@ -13,7 +13,6 @@
 import uuid
 from datetime import datetime, timedelta, timezone
 
-import pytest
 from sqlalchemy import select
 
 from app.models.exercise import Muscle
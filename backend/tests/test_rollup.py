@@ -10,11 +10,13 @@ that property under churn.
 
 from __future__ import annotations
 
+import asyncio
 import random
 from datetime import datetime, timedelta, timezone
 
 import pytest
 from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from app.models.health_record import HealthRecord
 from app.models.metric_daily import MetricDaily
@@ -223,6 +225,36 @@ async def test_recompute_deletes_bucket_when_no_rows_remain(db_session) -> None:
     assert rows == []
 
 
+@pytest.mark.asyncio
+async def test_concurrent_recomputes_of_a_bucket_both_succeed(db_session) -> None:
+    """Two transactions recomputing the same bucket (parallel import consumers)
+    serialise instead of colliding on metric_daily's primary key."""
+    db = db_session
+    user = await _user(db)
+    t = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
+    await _add(db, user_id=user.id, metric_type="HeartRate", time=t, value=60.0)
+    await _add(db, user_id=user.id, metric_type="HeartRate", time=t + timedelta(hours=1), value=80.0)
+    await db.commit()
+    key = [(user.id, "HeartRate", t.date())]
+    factory = async_sessionmaker(bind=db.bind, expire_on_commit=False)
+
+    async with factory() as first, factory() as second:
+        await rollup.recompute_buckets(first, key)
+
+        async def recompute_second() -> None:
+            await rollup.recompute_buckets(second, key)
+            await second.commit()
+
+        waiting = asyncio.create_task(recompute_second())
+        await asyncio.sleep(0.2)
+        assert not waiting.done()  # blocked until the first commits
+        await first.commit()
+        await waiting
+
+    row = (await db.execute(select(MetricDaily))).scalar_one()
+    assert (row.count, row.sum) == (2, 140.0)
+
+
 @pytest.mark.asyncio
 async def test_recompute_for_rows_extracts_keys(db_session) -> None:
     """The ingest-hook convenience: recompute from a batch's row dicts."""
@@ -246,6 +278,25 @@ async def test_recompute_for_rows_extracts_keys(db_session) -> None:
     assert row.sum == 1200.0
 
 
+@pytest.mark.asyncio
+async def test_recompute_buckets_takes_more_keys_than_bind_parameters(db_session) -> None:
+    """Keys travel as three arrays, so a batch touching more buckets than
+    asyncpg's 32767-parameter cap still recomputes in one statement."""
+    db = db_session
+    user = await _user(db)
+    t = datetime(2024, 5, 1, 9, 0, tzinfo=timezone.utc)
+    await _add(db, user_id=user.id, metric_type="StepCount", time=t, value=500.0)
+    await db.commit()
+
+    day0 = t.date()
+    keys = [(user.id, "StepCount", day0 - timedelta(days=i)) for i in range(11_000)]
+    assert await rollup.recompute_buckets(db, keys) == 11_000
+    await db.commit()
+
+    row = (await db.execute(select(MetricDaily))).scalar_one()
+    assert (row.day, row.sum) == (day0, 500.0)
+
+
 # --------------------------------------------------------------------------- #
 # CARDINAL: rollup-derived series == raw-aggregated series (day/week/month)
 # --------------------------------------------------------------------------- #
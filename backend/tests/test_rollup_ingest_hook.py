@@ -28,7 +28,7 @@ from app.models.user import User
 from app.services.connectors.base import NormalizedRecord, SourceConnector
 from app.services.crypto import CredentialCipher
 from app.services.connection_query import create_connection, sync_connection
-from app.services.xml_parser import BatchPayload, _flush_batch
+from app.services.xml_parser import BatchPayload, HealthColumns, _flush_batch
 
 from cryptography.fernet import Fernet
 
@@ -57,11 +57,11 @@ async def test_xml_flush_batch_refreshes_rollups(db_session) -> None:
 
     day = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
     batch = BatchPayload(
-        health=[
+        health=HealthColumns.from_rows([
             {"time": day, "user_id": user.id, "metric_type": "HeartRate", "value": 60.0, "unit": "count/min", "end_time": None, "source_id": None, "batch_id": None},
             {"time": day + timedelta(hours=1), "user_id": user.id, "metric_type": "HeartRate", "value": 80.0, "unit": "count/min", "end_time": None, "source_id": None, "batch_id": None},
             {"time": day, "user_id": user.id, "metric_type": "StepCount", "value": 500.0, "unit": "count", "end_time": None, "source_id": None, "batch_id": None},
-        ]
+        ])
     )
 
     await _flush_batch(factory, batch)
@@ -85,12 +85,12 @@ async def test_xml_flush_batch_accumulates_across_batches(db_session) -> None:
     factory = async_sessionmaker(bind=db.bind, expire_on_commit=False)
     day = datetime(2024, 2, 1, 8, 0, tzinfo=timezone.utc)
 
-    await _flush_batch(factory, BatchPayload(health=[
+    await _flush_batch(factory, BatchPayload(health=HealthColumns.from_rows([
         {"time": day, "user_id": user.id, "metric_type": "HeartRate", "value": 60.0, "unit": "u", "end_time": None, "source_id": None, "batch_id": None},
-    ]))
-    await _flush_batch(factory, BatchPayload(health=[
+    ])))
+    await _flush_batch(factory, BatchPayload(health=HealthColumns.from_rows([
         {"time": day + timedelta(hours=2), "user_id": user.id, "metric_type": "HeartRate", "value": 100.0, "unit": "u", "end_time": None, "source_id": None, "batch_id": None},
-    ]))
+    ])))
 
     row = (await db.execute(select(MetricDaily))).scalar_one()
     assert row.count == 2
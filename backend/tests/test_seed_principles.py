@@ -8,7 +8,6 @@ must carry verified citations (a resolvable DOI or PMID) on every Principle.
 
 import re
 
-import pytest
 from sqlalchemy import func, select
 
 from app.models.principle import (
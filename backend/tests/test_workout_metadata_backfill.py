@@ -0,0 +1,71 @@
+"""Backfill of double-encoded ``workouts.metadata`` (migration ``a3c5e7f9b1d2``).
+
+The old INSERT path stored the metadata dict as a JSON *string*; the COPY path
+stores the object. ``unwrap_string_metadata(connection)`` — the exact function
+the migration's ``upgrade()`` calls — rewrites the old rows to the new shape.
+"""
+
+import json
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from app.migrations_support.workout_metadata import unwrap_string_metadata
+
+_META = {"HKIndoorWorkout": "0", "HKAverageMETs": "9.1 kcal/hr·kg"}
+
+
+def _create_schema(conn) -> None:
+    from app.database import Base
+
+    Base.metadata.create_all(conn)
+
+
+def _insert_workout(conn, user_id: int, minute: int, metadata_sql: str | None) -> uuid.UUID:
+    wid = uuid.uuid4()
+    conn.execute(
+        text(
+            "INSERT INTO workouts (id, user_id, time, activity_type, metadata) "
+            f"VALUES (:id, :uid, :t, 'Running', {metadata_sql or 'NULL'})"
+        ),
+        {
+            "id": wid,
+            "uid": user_id,
+            "t": datetime(2024, 1, 1, 8, minute, tzinfo=timezone.utc),
+            "meta": json.dumps(_META),
+        },
+    )
+    return wid
+
+
+def _metadata(conn, wid: uuid.UUID):
+    return conn.execute(
+        text("SELECT metadata FROM workouts WHERE id = :id"), {"id": wid}
+    ).scalar_one()
+
+
+def test_unwraps_string_metadata_and_leaves_the_rest(sync_engine) -> None:
+    with sync_engine.begin() as conn:
+        _create_schema(conn)
+        uid = conn.execute(
+            text("INSERT INTO users (email) VALUES ('a@example.com') RETURNING id")
+        ).scalar_one()
+        # What the old INSERT path wrote: the dumped dict, encoded again.
+        legacy = _insert_workout(conn, uid, 0, "to_jsonb(CAST(:meta AS text))")
+        # What the COPY path writes: the object itself.
+        current = _insert_workout(conn, uid, 1, "CAST(:meta AS jsonb)")
+        plain_string = _insert_workout(conn, uid, 2, "'\"indoor\"'::jsonb")
+        empty = _insert_workout(conn, uid, 3, None)
+        assert _metadata(conn, legacy) == json.dumps(_META)
+
+        assert unwrap_string_metadata(conn) == 1
+
+        assert _metadata(conn, legacy) == _META
+        assert _metadata(conn, current) == _META
+        assert _metadata(conn, plain_string) == "indoor"
+        assert _metadata(conn, empty) is None
+
+        # Idempotent: nothing is left to unwrap.
+        assert unwrap_string_metadata(conn) == 0
+        assert _metadata(conn, legacy) == _META
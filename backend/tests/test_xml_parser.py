@@ -1,26 +1,181 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+import uuid
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 
+import pytest
 from lxml import etree
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
+from app.config import Settings
+from app.models.activity_summary import ActivitySummary
+from app.models.category_record import CategoryRecord
+from app.models.data_source import DataSource
+from app.models.health_record import HealthRecord
+from app.models.import_batch import ImportBatch
+from app.models.user import User
+from app.models.workout import Workout
+from app.models.workout_route_point import WorkoutRoutePoint
+from app.services import xml_parser
 from app.services.xml_parser import (
+    BatchPayload,
+    HealthColumns,
+    _WORKOUT_NS,
+    _DataSourceCache,
+    _DateCache,
+    _cached_category_label,
+    _clean_category_value,
+    _clean_type_name,
+    _convert_duration_to_seconds,
+    _convert_to_kj,
+    _convert_to_meters,
+    _flush_batch,
+    _iter_export_items,
+    _parse_apple_date,
     _process_activity_summary_element,
     _process_record_element,
     _process_workout_element,
+    _progress_reporter,
+    _record_kind,
+    _safe_float,
+    _safe_int,
+    _scan_offsets,
+    _workout_uuid,
+    parse_health_export,
 )
 
 
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        # Fixed-width fast path.
+        ("2024-01-15 08:30:00 -0500", datetime(2024, 1, 15, 8, 30, tzinfo=timezone(timedelta(hours=-5)))),
+        ("2024-06-01 23:59:59 +0530", datetime(2024, 6, 1, 23, 59, 59, tzinfo=timezone(timedelta(hours=5, minutes=30)))),
+        ("2024-02-29 00:00:00 +0000", datetime(2024, 2, 29, tzinfo=timezone.utc)),
+        ("2023-12-31 23:59:59 +1400", datetime(2023, 12, 31, 23, 59, 59, tzinfo=timezone(timedelta(hours=14)))),
+        ("2024-01-01 00:00:00 -0930", datetime(2024, 1, 1, tzinfo=timezone(-timedelta(hours=9, minutes=30)))),
+        # Either side of a DST change: Apple writes the offset in force then.
+        ("2024-03-31 00:59:59 +0000", datetime(2024, 3, 31, 0, 59, 59, tzinfo=timezone.utc)),
+        ("2024-03-31 03:00:00 +0200", datetime(2024, 3, 31, 3, 0, tzinfo=timezone(timedelta(hours=2)))),
+        # Off-layout whitespace falls back to the regex path.
+        (" 2024-01-15  08:30:00 +0000", datetime(2024, 1, 15, 8, 30, tzinfo=timezone.utc)),
+        # Well-shaped but impossible, or not a date at all.
+        ("2024-02-30 08:00:00 +0000", None),
+        ("2023-02-29 08:00:00 +0000", None),
+        ("2024-13-01 08:00:00 +0000", None),
+        ("2024-01-15 08:30:00 x0500", None),
+        ("not a date", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_parse_apple_date(raw: str | None, expected: datetime | None) -> None:
+    parsed = _parse_apple_date(raw)
+    assert parsed == expected
+    if expected is not None:
+        assert parsed.utcoffset() == expected.utcoffset()
+
+
+@pytest.mark.parametrize(
+    ("value", "unit", "expected"),
+    [
+        (1.0, "kcal", 4.184),
+        (1.0, "Cal", 4.184),
+        (2.0, "kJ", 2.0),
+        # Off-canonical spellings take the normalising fallback.
+        (1.0, " KCAL ", 4.184),
+        (2.0, "kj", 2.0),
+        (3.0, "J", 3.0),
+        (None, "kcal", None),
+        (1.0, None, None),
+    ],
+)
+def test_convert_to_kj(value: float | None, unit: str | None, expected: float | None) -> None:
+    assert _convert_to_kj(value, unit) == expected
+
+
+@pytest.mark.parametrize(
+    ("parse", "raw", "expected"),
+    [
+        (_safe_float, "3.14", 3.14),
+        (_safe_float, "42", 42.0),
+        (_safe_float, "not-a-number", None),
+        (_safe_float, None, None),
+        (_safe_int, "10", 10),
+        (_safe_int, "10.5", None),
+        (_safe_int, None, None),
+    ],
+)
+def test_safe_number_parsing(parse, raw: str | None, expected) -> None:
+    assert parse(raw) == expected
+
+
+@pytest.mark.parametrize(
+    ("raw", "prefix", "expected"),
+    [
+        ("HKQuantityTypeIdentifierStepCount", "HKQuantityTypeIdentifier", "StepCount"),
+        ("HKWorkoutActivityTypeRunning", "HKWorkoutActivityType", "Running"),
+        ("CustomType", "HKQuantityTypeIdentifier", "CustomType"),
+    ],
+)
+def test_clean_type_name(raw: str, prefix: str, expected: str) -> None:
+    assert _clean_type_name(raw, prefix) == expected
+
+
+@pytest.mark.parametrize(
+    ("convert", "value", "unit", "expected"),
+    [
+        (_convert_to_meters, 2.0, "km", 2_000.0),
+        (_convert_to_meters, 1.0, "mi", 1_609.344),
+        (_convert_to_meters, 5.0, "m", 5.0),
+        (_convert_to_meters, 1.0, " Miles ", 1_609.344),
+        (_convert_to_meters, 3.0, "yd", 3.0),
+        (_convert_duration_to_seconds, 2.0, "min", 120.0),
+        (_convert_duration_to_seconds, 1.5, "hr", 5_400.0),
+        (_convert_duration_to_seconds, 9.0, "s", 9.0),
+        (_convert_duration_to_seconds, 1.0, "Hours", 3_600.0),
+        (_convert_duration_to_seconds, None, "min", None),
+    ],
+)
+def test_convert_distance_and_duration(convert, value, unit, expected) -> None:
+    assert convert(value, unit) == expected
+
+
+def test_date_cache_memoizes_and_resets_when_full() -> None:
+    cache = _DateCache(maxsize=2)
+    first = cache.parse("2024-01-15 08:30:00 -0500")
+    assert cache.parse("2024-01-15 08:30:00 -0500") is first
+
+    cache.parse("2024-01-15 08:31:00 -0500")
+    cache.parse("2024-01-15 08:32:00 -0500")
+    again = cache.parse("2024-01-15 08:30:00 -0500")
+    assert again == first and again is not first
+
+
+# Record helpers take the attribute dict ``_ExportTarget`` hands them; one
+# test below keeps a real lxml element to pin that both shapes still work.
+_HEART_RATE_ATTRS = {
+    "type": "HKQuantityTypeIdentifierHeartRate",
+    "unit": "count/min",
+    "startDate": "2024-01-01 08:00:00 +0000",
+    "endDate": "2024-01-01 08:00:00 +0000",
+    "value": "61",
+}
+
+
 def test_process_record_element_category_uses_clean_labels() -> None:
-    elem = etree.fromstring(
-        """
-        <Record
-            type="HKCategoryTypeIdentifierSleepAnalysis"
-            sourceName="Watch"
-            startDate="2024-01-01 23:00:00 +0000"
-            endDate="2024-01-02 07:00:00 +0000"
-            value="HKCategoryValueSleepAnalysisAsleepREM"
-        />
-        """
-    )
+    elem = {
+        "type": "HKCategoryTypeIdentifierSleepAnalysis",
+        "sourceName": "Watch",
+        "startDate": "2024-01-01 23:00:00 +0000",
+        "endDate": "2024-01-02 07:00:00 +0000",
+        "value": "HKCategoryValueSleepAnalysisAsleepREM",
+    }
 
     result = _process_record_element(elem, user_id=1, batch_id="batch", source_id=2)
 
@@ -31,6 +186,53 @@ def test_process_record_element_category_uses_clean_labels() -> None:
     assert record["value_label"] == "Sleep Analysis Asleep REM"
 
 
+def test_process_record_element_quantity_appends_as_columns() -> None:
+    kind, row = _process_record_element(
+        dict(_HEART_RATE_ATTRS), user_id=1, batch_id="batch", source_id=2
+    )
+    cols = HealthColumns()
+    cols.append(row)
+
+    assert kind == "health"
+    assert len(cols) == 1
+    assert cols.metric_type == ["HeartRate"]
+    assert cols.value == [61.0]
+    assert cols.columns()["source_id"] == [2]
+
+
+def test_process_record_element_accepts_an_lxml_element() -> None:
+    attrs = " ".join(f'{k}="{v}"' for k, v in _HEART_RATE_ATTRS.items())
+    elem = etree.fromstring(f"<Record {attrs}/>")
+
+    from_elem = _process_record_element(elem, user_id=1, batch_id="batch", source_id=2)
+    from_dict = _process_record_element(
+        dict(_HEART_RATE_ATTRS), user_id=1, batch_id="batch", source_id=2
+    )
+
+    assert from_elem == from_dict
+
+
+@pytest.mark.parametrize(
+    ("record_type", "expected"),
+    [
+        ("HKQuantityTypeIdentifierHeartRate", ("health", "HeartRate")),
+        ("HKCategoryTypeIdentifierSleepAnalysis", ("category", "SleepAnalysis")),
+        ("HKDataTypeSleepDurationGoal", (None, "HKDataTypeSleepDurationGoal")),
+    ],
+)
+def test_record_kind(record_type: str, expected: tuple) -> None:
+    assert _record_kind(record_type) == expected
+
+
+def test_cached_category_label_memoizes_clean_value() -> None:
+    raw = "HKCategoryValueSleepAnalysisAsleepDeep"
+
+    label = _cached_category_label(raw)
+
+    assert label == _clean_category_value(raw) == "Sleep Analysis Asleep Deep"
+    assert _cached_category_label(raw) is label
+
+
 def test_process_activity_summary_includes_batch_id() -> None:
     elem = etree.fromstring(
         """
@@ -84,7 +286,9 @@ def test_process_workout_element_loads_route_points_from_gpx(tmp_path: Path) ->
             startDate="2024-01-01 10:00:00 +0000"
             endDate="2024-01-01 10:30:00 +0000"
         >
+            <MetadataEntry key="HKIndoorWorkout" value="0" />
             <WorkoutRoute>
+                <MetadataEntry key="HKMetadataKeySyncVersion" value="2" />
                 <FileReference path="workout-routes/sample-route.gpx" />
             </WorkoutRoute>
         </Workout>
@@ -102,6 +306,322 @@ def test_process_workout_element_loads_route_points_from_gpx(tmp_path: Path) ->
     assert workout["activity_type"] == "Running"
     assert workout["duration_sec"] == 1800.0
     assert workout["total_distance_m"] == 5000.0
+    assert workout["metadata"] == {"HKIndoorWorkout": "0"}
     assert len(route_points) == 2
     assert route_points[0]["latitude"] == 51.5
     assert route_points[0]["longitude"] == -0.12
+
+
+async def test_flush_batch_lands_every_table_concurrently(db_session) -> None:
+    db = db_session
+    user = User(email="alice@example.com")
+    db.add(user)
+    await db.commit()
+    factory = async_sessionmaker(bind=db.bind, expire_on_commit=False)
+
+    start = datetime(2024, 1, 1, 10, 0, tzinfo=timezone.utc)
+    workout_id = uuid.uuid4()
+    batch = BatchPayload(
+        health=HealthColumns.from_rows([
+            {"time": start, "user_id": user.id, "metric_type": "StepCount", "value": 500.0, "unit": "count", "end_time": None, "source_id": None, "batch_id": None},
+        ]),
+        category=[
+            {"time": start, "user_id": user.id, "category_type": "SleepAnalysis", "value": "HKx", "value_label": "Asleep", "end_time": None, "source_id": None, "batch_id": None},
+        ],
+        workouts=[
+            {"id": workout_id, "user_id": user.id, "time": start, "end_time": start + timedelta(minutes=30), "activity_type": "Running", "duration_sec": 1800.0, "total_distance_m": None, "total_energy_kj": None, "source_id": None, "batch_id": None, "metadata": None},
+        ],
+        route_points=[
+            {"time": start, "workout_id": workout_id, "latitude": 51.5, "longitude": -0.12, "altitude_m": None},
+        ],
+        activity=[
+            {"date": date(2024, 1, 1), "user_id": user.id, "active_energy_burned_kj": 1.0, "active_energy_goal_kj": 2.0, "exercise_minutes": 3.0, "exercise_goal_minutes": 4.0, "stand_hours": 5, "stand_goal_hours": 6, "batch_id": None},
+        ],
+    )
+
+    await _flush_batch(factory, batch)
+
+    for model in (HealthRecord, CategoryRecord, Workout, WorkoutRoutePoint, ActivitySummary):
+        count = (await db.execute(select(func.count()).select_from(model))).scalar_one()
+        assert count == 1, model.__tablename__
+
+
+async def test_flush_batch_shards_health_rows_across_sessions(db_session) -> None:
+    db = db_session
+    user = User(email="alice@example.com")
+    db.add(user)
+    await db.commit()
+    factory = async_sessionmaker(bind=db.bind, expire_on_commit=False)
+
+    start = datetime(2024, 1, 1, 0, 0, tzinfo=timezone.utc)
+    rows = [
+        {"time": start + timedelta(minutes=i), "user_id": user.id, "metric_type": "HeartRate", "value": 60 + i % 20, "unit": "count/min", "end_time": None, "source_id": None, "batch_id": None}
+        for i in range(101)
+    ]
+    # The last row repeats the first: a duplicate within one batch is skipped.
+    rows.append(dict(rows[0]))
+
+    await _flush_batch(factory, BatchPayload(health=HealthColumns.from_rows(rows)))
+
+    count = (await db.execute(select(func.count()).select_from(HealthRecord))).scalar_one()
+    assert count == 101
+
+
+_EXPORT_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<HealthData locale="en_GB">
+ <Record type="HKQuantityTypeIdentifierHeartRate" sourceName="Watch" sourceVersion="10.1" unit="count/min" startDate="2024-01-01 08:00:00 +0000" endDate="2024-01-01 08:00:00 +0000" value="61"/>
+ <Record type="HKQuantityTypeIdentifierHeartRate" sourceName="Watch" sourceVersion="10.1" unit="count/min" startDate="2024-01-01 08:01:00 +0000" endDate="2024-01-01 08:01:00 +0000" value="63"/>
+ <Record type="HKQuantityTypeIdentifierStepCount" sourceName="Phone" unit="count" startDate="2024-01-01 08:00:00 +0000" endDate="2024-01-01 08:05:00 +0000" value="120"/>
+ <Record type="HKCategoryTypeIdentifierSleepAnalysis" sourceName="Watch" sourceVersion="10.1" startDate="2024-01-01 23:00:00 +0000" endDate="2024-01-02 07:00:00 +0000" value="HKCategoryValueSleepAnalysisAsleepCore"/>
+ <Workout workoutActivityType="HKWorkoutActivityTypeRunning" duration="30" durationUnit="min" sourceName="Watch" sourceVersion="10.1" startDate="2024-01-01 10:00:00 +0000" endDate="2024-01-01 10:30:00 +0000">
+  <MetadataEntry key="HKIndoorWorkout" value="0"/>
+  <WorkoutRoute sourceName="Watch" startDate="2024-01-01 10:00:00 +0000" endDate="2024-01-01 10:30:00 +0000">
+   <MetadataEntry key="HKMetadataKeySyncVersion" value="2"/>
+   <Location date="2024-01-01 10:00:00 +0000" latitude="51.5" longitude="-0.12" altitude="10"/>
+   <Location date="2024-01-01 10:01:00 +0000" latitude="51.5005" longitude="-0.1205" altitude="11"/>
+  </WorkoutRoute>
+ </Workout>
+ <ActivitySummary dateComponents="2024-01-01" activeEnergyBurned="320" activeEnergyBurnedUnit="kcal" activeEnergyBurnedGoal="500" appleExerciseTime="45" appleExerciseTimeGoal="30" appleStandHours="10" appleStandHoursGoal="12"/>
+</HealthData>
+"""
+
+
+@pytest.mark.parametrize("sharded", [False, True], ids=["threaded", "sharded"])
+async def test_parse_health_export_lands_every_element(
+    db_session, tmp_path: Path, monkeypatch, sharded: bool
+) -> None:
+    if sharded:
+        monkeypatch.setattr(xml_parser, "PARALLEL_PARSE_MIN_BYTES", 0)
+        monkeypatch.setattr(xml_parser, "PARSE_PROCESSES", 3)
+    db = db_session
+    user = User(email="alice@example.com")
+    db.add(user)
+    await db.flush()
+    batch = ImportBatch(user_id=user.id, filename="export.xml")
+    db.add(batch)
+    await db.commit()
+    factory = async_sessionmaker(bind=db.bind, expire_on_commit=False)
+    export = tmp_path / "export.xml"
+    export.write_text(_EXPORT_XML, encoding="utf-8")
+
+    total = await parse_health_export(str(export), user.id, str(batch.id), factory)
+
+    assert total == 6
+    health = (
+        await db.execute(select(HealthRecord).order_by(HealthRecord.time, HealthRecord.metric_type))
+    ).scalars().all()
+    assert [(r.metric_type, r.value) for r in health] == [
+        ("HeartRate", 61.0), ("StepCount", 120.0), ("HeartRate", 63.0),
+    ]
+    assert all(r.batch_id == batch.id for r in health)
+    assert all(isinstance(r.source_id, int) for r in health)
+    sleep = (await db.execute(select(CategoryRecord))).scalar_one()
+    assert sleep.value_label == "Sleep Analysis Asleep Core"
+    workout = (await db.execute(select(Workout))).scalar_one()
+    assert (workout.activity_type, workout.duration_sec) == ("Running", 1800.0)
+    assert workout.metadata_ == {"HKIndoorWorkout": "0"}
+    points = (await db.execute(select(func.count()).select_from(WorkoutRoutePoint))).scalar_one()
+    assert points == 2
+    summary = (await db.execute(select(ActivitySummary))).scalar_one()
+    assert summary.stand_hours == 10
+    sources = {
+        (s.name, s.bundle_id) for s in (await db.execute(select(DataSource))).scalars()
+    }
+    assert sources == {("Watch", "10.1"), ("Phone", None)}
+
+    await db.refresh(batch)
+    assert (batch.status, batch.record_count) == ("completed", 6)
+
+
+async def test_sharded_parse_fails_when_a_shard_dies(
+    db_session, tmp_path: Path, monkeypatch
+) -> None:
+    monkeypatch.setattr(xml_parser, "PARALLEL_PARSE_MIN_BYTES", 0)
+    monkeypatch.setattr(xml_parser, "PARSE_PROCESSES", 3)
+    # Spawned shards read settings afresh: one row per batch keeps each of
+    # them far from done when the first batch arrives.
+    monkeypatch.setenv("IMPORT_BATCH_ROWS", "1")
+    db = db_session
+    user = User(email="alice@example.com")
+    db.add(user)
+    await db.flush()
+    batch = ImportBatch(user_id=user.id, filename="export.xml")
+    db.add(batch)
+    await db.commit()
+    factory = async_sessionmaker(bind=db.bind, expire_on_commit=False)
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    records = "".join(
+        f' <Record type="HKQuantityTypeIdentifierHeartRate" sourceName="Watch" '
+        f'unit="count/min" startDate="{(t0 + timedelta(minutes=i)):%Y-%m-%d %H:%M:%S} +0000" '
+        f'endDate="{(t0 + timedelta(minutes=i)):%Y-%m-%d %H:%M:%S} +0000" value="{60 + i % 40}"/>\n'
+        for i in range(180)
+    )
+    export = tmp_path / "export.xml"
+    export.write_text(
+        '<?xml version="1.0" encoding="UTF-8"?>\n<HealthData locale="en_GB">\n'
+        + records + "</HealthData>\n",
+        encoding="utf-8",
+    )
+
+    forward = xml_parser._forward_batch
+    killed: list[str] = []
+
+    async def forward_then_kill(*args, **kwargs):
+        if not killed:
+            victim = next(
+                p for p in multiprocessing.active_children()
+                if p.name.startswith("xml-parse-")
+            )
+            os.kill(victim.pid, signal.SIGKILL)
+            killed.append(victim.name)
+        await forward(*args, **kwargs)
+
+    monkeypatch.setattr(xml_parser, "_forward_batch", forward_then_kill)
+
+    with pytest.raises(ValueError, match="exited with code -9 before finishing") as exc:
+        await asyncio.wait_for(
+            parse_health_export(str(export), user.id, str(batch.id), factory), 60
+        )
+
+    assert killed[0] in str(exc.value)
+    assert not [
+        p for p in multiprocessing.active_children() if p.name.startswith("xml-parse-")
+    ]
+
+
+def test_scan_offsets_cuts_on_top_level_elements(tmp_path: Path) -> None:
+    export = tmp_path / "export.xml"
+    export.write_text(_EXPORT_XML, encoding="utf-8")
+    data = export.read_bytes()
+
+    header, ranges = _scan_offsets(str(export), 3)
+
+    assert header.endswith(b'<HealthData locale="en_GB">')
+    assert len(ranges) == 3
+    assert ranges[0][0] == len(header)
+    assert ranges[-1][1] == data.rindex(b"</HealthData>")
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    for start, end in ranges[1:]:
+        assert data[start:start + 2] == b" <" and data[start + 2:start + 3] != b"/"
+    for start, end in ranges:
+        etree.fromstring(header + data[start:end] + b"</HealthData>")
+
+
+def test_iter_export_items_recovers_then_raises_on_fatal_errors(tmp_path) -> None:
+    export = tmp_path / "export.xml"
+    export.write_text(
+        '<HealthData><Record type="A" value="x & y"/><Record type="B"/><Rec',
+        encoding="utf-8",
+    )
+
+    seen = []
+    with pytest.raises(ValueError, match="malformed"):
+        for tag, attrs, _children in _iter_export_items(str(export)):
+            seen.append((tag, attrs.get("type")))
+
+    assert seen == [("Record", "A"), ("Record", "B")]
+
+
+async def test_data_source_cache_saves_placeholders_in_one_flush(db_session) -> None:
+    db = db_session
+    db.add(DataSource(name="Scale", bundle_id=None))
+    await db.commit()
+    cache = _DataSourceCache()
+
+    watch = cache.placeholder("Watch", "10.1", "Apple Watch")
+    scale = cache.placeholder("Scale", None, None)
+    assert watch < 0 and scale < 0
+    assert cache.placeholder("Watch", "10.1", None) == watch
+
+    batch = BatchPayload(
+        category=[{"source_id": watch}, {"source_id": None}],
+        has_placeholders=True,
+    )
+    batch.health.source_id = [scale, watch, 7]
+    await cache.flush_pending(db)
+    await db.commit()
+    cache.resolve_batch(batch)
+
+    ids = {
+        (s.name, s.bundle_id): s.id
+        for s in (await db.execute(select(DataSource))).scalars()
+    }
+    assert len(ids) == 2
+    assert batch.health.source_id == [ids[("Scale", None)], ids[("Watch", "10.1")], 7]
+    assert [r["source_id"] for r in batch.category] == [ids[("Watch", "10.1")], None]
+    assert cache.lookup("Watch", "10.1") == ids[("Watch", "10.1")]
+    assert not batch.has_placeholders
+
+    # A second import racing on the same keys reuses the rows it finds.
+    other = _DataSourceCache()
+    other.placeholder("Watch", "10.1", None)
+    other.placeholder("Scale", None, None)
+    await other.flush_pending(db)
+    await db.commit()
+    assert other.lookup("Watch", "10.1") == ids[("Watch", "10.1")]
+    assert other.lookup("Scale", None) == ids[("Scale", None)]
+    assert (await db.execute(select(func.count()).select_from(DataSource))).scalar_one() == 2
+
+
+@pytest.mark.parametrize(
+    "dedup_key",
+    ["1:2024-01-01T10:00:00+00:00:Running", "42::Other", "7:2023-06-30T23:59:59-05:00:Yoga"],
+)
+def test_workout_uuid_matches_uuid5(dedup_key: str) -> None:
+    assert _workout_uuid(dedup_key) == uuid.uuid5(_WORKOUT_NS, dedup_key)
+
+
+@pytest.mark.parametrize("rows", [0, -1])
+def test_import_batch_rows_must_be_positive(rows: int) -> None:
+    with pytest.raises(ValidationError):
+        Settings(DATABASE_URL="x", IMPORT_BATCH_ROWS=rows)
+
+
+def test_batch_split_full_moves_only_full_tables() -> None:
+    batch = BatchPayload(
+        category=[{"n": i} for i in range(3)],
+        workouts=[{"n": 0}],
+        route_points=[{"n": i} for i in range(3)],
+        activity=[{"n": 0}],
+        has_placeholders=True,
+    )
+    batch.health.append((None, 1, "HeartRate", 60.0, "count/min", None, None, None))
+
+    full = batch.split_full(3)
+
+    assert (len(full.category), len(full.workouts), len(full.route_points)) == (3, 1, 3)
+    assert (len(full.health), len(full.activity)) == (0, 0)
+    assert full.has_placeholders
+    assert (len(batch.health), len(batch.category), len(batch.activity)) == (1, 0, 1)
+    assert batch.workouts == [] and batch.route_points == []
+
+
+def test_process_record_element_shares_repeated_strings() -> None:
+    def record(value: str) -> dict[str, str]:
+        # Fresh string objects per call, as the parser produces them.
+        attrs = {**_HEART_RATE_ATTRS, "value": value}
+        return {k: v.encode().decode() for k, v in attrs.items()}
+
+    _, first = _process_record_element(record("61"), user_id=1, batch_id="b", source_id=None)
+    _, second = _process_record_element(record("62"), user_id=1, batch_id="b", source_id=None)
+
+    assert first[2] is second[2]  # metric_type
+    assert first[4] is second[4]  # unit
+
+
+async def test_progress_reporter_writes_count_and_sees_cancellation(db_session) -> None:
+    db = db_session
+    user = User(email="alice@example.com")
+    db.add(user)
+    await db.flush()
+    batch = ImportBatch(user_id=user.id, filename="export.xml", status="cancelling")
+    db.add(batch)
+    await db.commit()
+    factory = async_sessionmaker(bind=db.bind, expire_on_commit=False)
+    cancelled = [False]
+
+    await _progress_reporter(factory, str(batch.id), [5], cancelled, interval=0)
+
+    assert cancelled == [True]
+    await db.refresh(batch)
+    assert batch.record_count == 5